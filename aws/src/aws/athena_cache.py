@@ -0,0 +1,163 @@
+"""Local Parquet cache in front of ``wr.athena.read_sql_query``.
+
+Results are keyed by normalized SQL (comments and whitespace outside string
+literals do not matter), database, workgroup and every other argument
+passed through to ``read_sql_query`` (``params``, ``ctas_approach``,
+``s3_output``...). Each lives at
+``<key>.parquet`` with a ``<key>.json`` sidecar, expires after a TTL, and the
+least recently used entries are evicted once the cache exceeds
+``max_bytes``::
+
+    from aws.athena_cache import AthenaCache
+
+    cache = AthenaCache(ttl=6 * 3600)
+    df = cache.read_sql_query(query, database="steering_control_data_raw")
+    expr = cache.to_ibis(query, database="steering_control_data_raw")  # DuckDB-backed
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+
+import awswrangler as wr
+import duckdb
+import ibis
+import pandas as pd
+
+DEFAULT_CACHE = Path.home() / ".cache" / "aws" / "athena"
+
+# String literals and quoted identifiers are kept verbatim; comments are dropped.
+_SQL_TOKENS = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")|(?:\s+|--[^\n]*|/\*.*?\*/)+""", re.S)
+
+
+def normalize_sql(sql: str) -> str:
+    """Canonical form of a query for cache keys."""
+    normalized = _SQL_TOKENS.sub(lambda match: match.group(1) or " ", sql)
+    return normalized.strip().rstrip(";").strip()
+
+
+class AthenaCache:
+    """Parquet-on-disk cache of Athena query results."""
+
+    def __init__(
+        self,
+        path: str | Path = DEFAULT_CACHE,
+        ttl: float = 24 * 3600,
+        max_bytes: int = 5 * 1024**3,
+    ):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+    def key(self, sql: str, database: str | None, workgroup: str, **kwargs) -> str:
+        payload = json.dumps([normalize_sql(sql), database, workgroup, kwargs], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _fresh(self, key: str, ttl: float) -> bool:
+        meta = self.path / f"{key}.json"
+        data = self.path / f"{key}.parquet"
+        if not (meta.exists() and data.exists()):
+            return False
+        return time.time() - json.loads(meta.read_text())["created"] < ttl
+
+    def parquet_path(
+        self,
+        sql: str,
+        database: str | None = None,
+        workgroup: str = "primary",
+        ttl: float | None = None,
+        refresh: bool = False,
+        **kwargs,
+    ) -> Path:
+        """Path to the cached result, running the query in Athena on a miss.
+
+        Extra ``kwargs`` go to ``wr.athena.read_sql_query``.
+        """
+        key = self.key(sql, database, workgroup, **kwargs)
+        data = self.path / f"{key}.parquet"
+        ttl = self.ttl if ttl is None else ttl
+        if not refresh and self._fresh(key, ttl):
+            # mtime doubles as the LRU clock for eviction.
+            os.utime(data)
+            return data
+
+        df = wr.athena.read_sql_query(sql, database=database, workgroup=workgroup, **kwargs)
+        tmp = data.with_suffix(f".{os.getpid()}.tmp")
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, data)
+        (self.path / f"{key}.json").write_text(
+            json.dumps(
+                {
+                    "sql": normalize_sql(sql),
+                    "database": database,
+                    "workgroup": workgroup,
+                    "created": time.time(),
+                    "ttl": ttl,
+                    "rows": len(df),
+                }
+            )
+        )
+        self.evict(keep=key)
+        return data
+
+    def read_sql_query(self, sql: str, database: str | None = None, workgroup: str = "primary", **kwargs) -> pd.DataFrame:
+        """Drop-in for ``wr.athena.read_sql_query`` that serves repeats from disk."""
+        return pd.read_parquet(self.parquet_path(sql, database, workgroup, **kwargs))
+
+    def to_duckdb(
+        self, sql: str, database: str | None = None, workgroup: str = "primary", con=None, **kwargs
+    ) -> duckdb.DuckDBPyRelation:
+        """The cached result as a lazy DuckDB relation."""
+        con = con or duckdb.connect()
+        return con.read_parquet(str(self.parquet_path(sql, database, workgroup, **kwargs)))
+
+    def to_ibis(self, sql: str, database: str | None = None, workgroup: str = "primary", con=None, **kwargs):
+        """The cached result as an ibis table on a DuckDB backend."""
+        con = con or ibis.duckdb.connect()
+        return con.read_parquet(self.parquet_path(sql, database, workgroup, **kwargs))
+
+    def entries(self) -> list[dict]:
+        """Metadata for every cached result, newest use first."""
+        entries = []
+        for meta in self.path.glob("*.json"):
+            data = meta.with_suffix(".parquet")
+            if data.exists():
+                stat = data.stat()
+                entries.append(
+                    {**json.loads(meta.read_text()), "key": meta.stem, "bytes": stat.st_size, "used": stat.st_mtime}
+                )
+        return sorted(entries, key=lambda entry: entry["used"], reverse=True)
+
+    def evict(self, keep: str | None = None) -> list[str]:
+        """Drop expired entries, then least recently used ones over ``max_bytes``.
+
+        Entries expire by the TTL they were written with. ``keep`` is never
+        evicted, so a just-written result larger than ``max_bytes`` survives
+        until the next write.
+        """
+        removed = []
+        total = 0
+        now = time.time()
+        for entry in self.entries():
+            if entry["key"] == keep:
+                continue
+            total += entry["bytes"]
+            if total > self.max_bytes or now - entry["created"] >= entry.get("ttl", self.ttl):
+                total -= entry["bytes"]
+                self.invalidate(entry["key"])
+                removed.append(entry["key"])
+        return removed
+
+    def invalidate(self, key: str) -> None:
+        for suffix in (".parquet", ".json"):
+            (self.path / f"{key}{suffix}").unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        for entry in self.entries():
+            self.invalidate(entry["key"])
@@ -0,0 +1,240 @@
+"""Glue Data Catalog inventory with a local DuckDB cache.
+
+Replaces the serial helpers in ``s3_info_details.ipynb``: one shared,
+thread-safe Glue client lists every database's tables concurrently, and
+``get_tables`` pages already carry columns and locations, so no per-table
+``get_table`` call is needed. Results land in DuckDB and are only fetched
+again once older than the TTL::
+
+    from aws.glue_catalog import CatalogCache
+
+    catalog = CatalogCache(ttl=3600)
+    catalog.tables("steering_control_data_raw").df()
+    catalog.columns().filter("column_type = 'timestamp'").df()
+"""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import boto3
+import duckdb
+import pyarrow as pa
+from botocore.config import Config
+
+DEFAULT_CACHE = Path.home() / ".cache" / "aws" / "glue_catalog.duckdb"
+
+TABLE_SCHEMA = pa.schema(
+    [
+        ("database", pa.string()),
+        ("table", pa.string()),
+        ("table_type", pa.string()),
+        ("location", pa.string()),
+        ("input_format", pa.string()),
+        ("partition_keys", pa.list_(pa.string())),
+        ("column_count", pa.int32()),
+        ("update_time", pa.timestamp("us", tz="UTC")),
+    ]
+)
+
+COLUMN_SCHEMA = pa.schema(
+    [
+        ("database", pa.string()),
+        ("table", pa.string()),
+        ("position", pa.int32()),
+        ("column_name", pa.string()),
+        ("column_type", pa.string()),
+        ("is_partition_key", pa.bool_()),
+        ("comment", pa.string()),
+    ]
+)
+
+
+def glue_client(session: boto3.Session | None = None, max_workers: int = 16):
+    """A Glue client sized for ``max_workers`` threads sharing it.
+
+    boto3 clients are thread-safe; the connection pool has to be at least
+    as large as the worker count or threads queue for sockets.
+    """
+    session = session or boto3.Session()
+    config = Config(
+        max_pool_connections=max_workers,
+        retries={"mode": "adaptive", "max_attempts": 10},
+    )
+    return session.client("glue", config=config)
+
+
+def list_databases(client) -> list[str]:
+    """Names of every database in the catalog."""
+    paginator = client.get_paginator("get_databases")
+    return [db["Name"] for page in paginator.paginate() for db in page["DatabaseList"]]
+
+
+def list_tables(client, database: str, paginator=None) -> list[dict]:
+    """Full table definitions for one database, as returned by ``get_tables``."""
+    paginator = paginator or client.get_paginator("get_tables")
+    return [table for page in paginator.paginate(DatabaseName=database) for table in page["TableList"]]
+
+
+def _rows(database: str, tables: list[dict]) -> tuple[list[dict], list[dict]]:
+    table_rows, column_rows = [], []
+    for table in tables:
+        descriptor = table.get("StorageDescriptor", {})
+        columns = descriptor.get("Columns", [])
+        keys = table.get("PartitionKeys", [])
+        table_rows.append(
+            {
+                "database": database,
+                "table": table["Name"],
+                "table_type": table.get("TableType"),
+                "location": descriptor.get("Location"),
+                "input_format": descriptor.get("InputFormat"),
+                "partition_keys": [key["Name"] for key in keys],
+                "column_count": len(columns) + len(keys),
+                "update_time": table.get("UpdateTime"),
+            }
+        )
+        for position, (column, is_key) in enumerate(
+            [(c, False) for c in columns] + [(k, True) for k in keys]
+        ):
+            column_rows.append(
+                {
+                    "database": database,
+                    "table": table["Name"],
+                    "position": position,
+                    "column_name": column["Name"],
+                    "column_type": column.get("Type"),
+                    "is_partition_key": is_key,
+                    "comment": column.get("Comment"),
+                }
+            )
+    return table_rows, column_rows
+
+
+def inventory(
+    client=None, databases: list[str] | None = None, max_workers: int = 16
+) -> tuple[pa.Table, pa.Table]:
+    """Fetch tables and columns for ``databases`` (default: all) concurrently.
+
+    Returns ``(tables, columns)`` as Arrow tables.
+    """
+    client = client or glue_client(max_workers=max_workers)
+    if databases is None:
+        databases = list_databases(client)
+    paginator = client.get_paginator("get_tables")
+    table_rows, column_rows = [], []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = pool.map(lambda db: _rows(db, list_tables(client, db, paginator)), databases)
+        for tables, columns in results:
+            table_rows.extend(tables)
+            column_rows.extend(columns)
+    return (
+        pa.Table.from_pylist(table_rows, schema=TABLE_SCHEMA),
+        pa.Table.from_pylist(column_rows, schema=COLUMN_SCHEMA),
+    )
+
+
+class CatalogCache:
+    """Glue inventory persisted in DuckDB, refreshed per database after ``ttl`` seconds.
+
+    The cache file is a plain DuckDB database (tables ``glue_tables``,
+    ``glue_columns``, ``glue_refresh`` and ``glue_listing``), so it can also be opened
+    directly, e.g. with ``ibis.duckdb.connect(path)``.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = DEFAULT_CACHE,
+        ttl: float = 3600,
+        client=None,
+        max_workers: int = 16,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self._client = client
+        self.con = duckdb.connect(str(self.path))
+        self.con.execute(
+            "CREATE TABLE IF NOT EXISTS glue_refresh (database VARCHAR PRIMARY KEY, refreshed_at DOUBLE)"
+        )
+        # When the full database list was last fetched; per-database refreshes don't count.
+        self.con.execute("CREATE TABLE IF NOT EXISTS glue_listing (listed_at DOUBLE)")
+        existing = {row[0] for row in self.con.execute("SELECT table_name FROM information_schema.tables").fetchall()}
+        for name, schema in (("glue_tables", TABLE_SCHEMA), ("glue_columns", COLUMN_SCHEMA)):
+            if name not in existing:
+                self.con.from_arrow(schema.empty_table()).create(name)
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = glue_client(max_workers=self.max_workers)
+        return self._client
+
+    def stale(self, databases: list[str] | None = None) -> list[str] | None:
+        """Databases whose cache entry is missing or older than the TTL.
+
+        With ``databases=None`` returns ``None`` when the whole catalog needs
+        listing again (never listed, or the last listing expired), otherwise
+        the listed databases that have expired since.
+        """
+        cutoff = time.time() - self.ttl
+        refreshed = dict(self.con.execute("SELECT database, refreshed_at FROM glue_refresh").fetchall())
+        if databases is None:
+            listed = self.con.execute("SELECT max(listed_at) FROM glue_listing").fetchone()[0]
+            if listed is None or listed < cutoff:
+                return None
+            databases = list(refreshed)
+        return [db for db in databases if refreshed.get(db, 0) < cutoff]
+
+    def refresh(self, databases: list[str] | None = None, force: bool = False) -> list[str]:
+        """Re-inventory stale databases (or all of them with ``force``); returns those refreshed."""
+        if force:
+            todo = databases
+        else:
+            todo = self.stale(databases)
+            if todo == []:
+                return []
+        full = todo is None
+        if full:
+            todo = list_databases(self.client)
+        tables, columns = inventory(self.client, todo, self.max_workers)
+        now = time.time()
+        self.con.execute("BEGIN")
+        try:
+            if full:
+                # Databases dropped from Glue disappear from the cache too.
+                for name in ("glue_tables", "glue_columns", "glue_refresh", "glue_listing"):
+                    self.con.execute(f"DELETE FROM {name}")
+                self.con.execute("INSERT INTO glue_listing VALUES (?)", [now])
+            else:
+                for name in ("glue_tables", "glue_columns", "glue_refresh"):
+                    self.con.execute(f"DELETE FROM {name} WHERE database IN (SELECT unnest(?))", [todo])
+            self.con.from_arrow(tables).insert_into("glue_tables")
+            self.con.from_arrow(columns).insert_into("glue_columns")
+            self.con.executemany("INSERT INTO glue_refresh VALUES (?, ?)", [(db, now) for db in todo])
+            self.con.execute("COMMIT")
+        except Exception:
+            self.con.execute("ROLLBACK")
+            raise
+        return todo
+
+    def tables(self, database: str | None = None) -> duckdb.DuckDBPyRelation:
+        """Cached tables, refreshing first if stale."""
+        return self._query("glue_tables", database)
+
+    def columns(self, database: str | None = None) -> duckdb.DuckDBPyRelation:
+        """Cached columns (partition keys included), refreshing first if stale."""
+        return self._query("glue_columns", database)
+
+    def _query(self, name: str, database: str | None) -> duckdb.DuckDBPyRelation:
+        self.refresh([database] if database else None)
+        relation = self.con.table(name)
+        if database:
+            relation = relation.filter(f"database = '{database.replace(chr(39), chr(39) * 2)}'")
+        return relation
+
+    def close(self) -> None:
+        self.con.close()
@@ -0,0 +1,168 @@
+"""Segmented, parallel Glue partition listing streamed into Arrow.
+
+``get_partitions`` accepts ``Segment={"SegmentNumber": i, "TotalSegments": n}``,
+which splits one table's partitions into ``n`` disjoint scans that Glue can
+serve in parallel. Each segment is paged on its own thread through one
+shared client, and every page becomes an Arrow record batch as soon as it
+arrives, so hundreds of thousands of partitions never sit in Python lists::
+
+    from aws.glue_partitions import get_partitions, write_partitions_parquet
+
+    snaps = get_partitions(
+        "steering_control_data_raw", "arbvorrat_sd53", expression="snap >= '2024_09_01'"
+    )
+    write_partitions_parquet("partitions.parquet", "steering_control_data_raw", "arbvorrat_sd53")
+
+Pass ``client=`` to reuse a client, e.g. one created under moto's ``mock_aws``.
+moto ignores ``Segment`` and returns every partition to every segment, so
+use ``segments=1`` against it.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from aws.glue_catalog import glue_client
+
+# Glue rejects TotalSegments outside 1..10.
+MAX_SEGMENTS = 10
+
+
+def partition_schema(partition_keys: list[str]) -> pa.Schema:
+    """One string column per partition key, then location and creation time."""
+    return pa.schema(
+        [(key, pa.string()) for key in partition_keys]
+        + [("location", pa.string()), ("creation_time", pa.timestamp("us", tz="UTC"))]
+    )
+
+
+def table_partition_keys(client, database: str, table: str) -> list[str]:
+    """Names of a table's partition keys, in order."""
+    response = client.get_table(DatabaseName=database, Name=table)
+    return [key["Name"] for key in response["Table"].get("PartitionKeys", [])]
+
+
+def _with_partition_keys(database: str, table: str, kwargs: dict) -> dict:
+    # Resolve keys (and the client) once, so an empty result needs no second call or scan.
+    if kwargs.get("partition_keys") is None:
+        client = kwargs.get("client") or glue_client(max_workers=kwargs.get("segments", MAX_SEGMENTS))
+        kwargs = {**kwargs, "client": client, "partition_keys": table_partition_keys(client, database, table)}
+    return kwargs
+
+
+def _page_to_batch(partitions: list[dict], schema: pa.Schema, key_count: int) -> pa.RecordBatch:
+    columns = [[p["Values"][i] for p in partitions] for i in range(key_count)]
+    columns.append([p.get("StorageDescriptor", {}).get("Location") for p in partitions])
+    columns.append([p.get("CreationTime") for p in partitions])
+    return pa.RecordBatch.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema
+    )
+
+
+def iter_partition_batches(
+    database: str,
+    table: str,
+    expression: str | None = None,
+    segments: int = MAX_SEGMENTS,
+    client=None,
+    partition_keys: list[str] | None = None,
+    page_size: int = 1000,
+) -> Iterator[pa.RecordBatch]:
+    """Yield record batches of partitions, one per ``get_partitions`` page.
+
+    ``expression`` is pushed down to Glue (e.g. ``"snap >= '2024_09_01'"``).
+    Batches arrive in completion order across segments, not partition order.
+    """
+    segments = max(1, min(segments, MAX_SEGMENTS))
+    client = client or glue_client(max_workers=segments)
+    if partition_keys is None:
+        partition_keys = table_partition_keys(client, database, table)
+    schema = partition_schema(partition_keys)
+    paginator = client.get_paginator("get_partitions")
+
+    # Bounded, so fast segments wait for the consumer instead of buffering everything.
+    batches: queue.Queue = queue.Queue(maxsize=segments * 2)
+    done = object()
+    stop = threading.Event()
+
+    def scan(segment: int) -> None:
+        try:
+            kwargs = {
+                "DatabaseName": database,
+                "TableName": table,
+                # Column schemas repeat the table's for every partition; skipping them shrinks pages a lot.
+                "ExcludeColumnSchema": True,
+                "PaginationConfig": {"PageSize": page_size},
+            }
+            if segments > 1:
+                kwargs["Segment"] = {"SegmentNumber": segment, "TotalSegments": segments}
+            if expression:
+                kwargs["Expression"] = expression
+            for page in paginator.paginate(**kwargs):
+                if stop.is_set():
+                    return
+                if page["Partitions"]:
+                    batches.put(_page_to_batch(page["Partitions"], schema, len(partition_keys)))
+            batches.put(done)
+        except Exception as e:  # handed to the consumer thread
+            batches.put(e)
+
+    threads = [threading.Thread(target=scan, args=(i,), daemon=True) for i in range(segments)]
+    for thread in threads:
+        thread.start()
+    try:
+        finished = 0
+        while finished < segments:
+            item = batches.get()
+            if item is done:
+                finished += 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        stop.set()
+        # Unblock scanners stuck on a full queue so they can see the stop flag.
+        while any(thread.is_alive() for thread in threads):
+            try:
+                batches.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+
+def get_partitions(database: str, table: str, expression: str | None = None, **kwargs) -> pa.Table:
+    """All matching partitions as one Arrow table (see ``iter_partition_batches``)."""
+    kwargs = _with_partition_keys(database, table, kwargs)
+    batches = iter_partition_batches(database, table, expression, **kwargs)
+    first = next(batches, None)
+    if first is None:
+        return partition_schema(kwargs["partition_keys"]).empty_table()
+    return pa.Table.from_batches([first, *batches])
+
+
+def write_partitions_parquet(
+    path: str | Path, database: str, table: str, expression: str | None = None, **kwargs
+) -> int:
+    """Stream matching partitions into a Parquet file; returns the row count."""
+    kwargs = _with_partition_keys(database, table, kwargs)
+    rows = 0
+    writer = None
+    try:
+        for batch in iter_partition_batches(database, table, expression, **kwargs):
+            if writer is None:
+                writer = pq.ParquetWriter(str(path), batch.schema)
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        # No partitions matched: still leave a valid, empty file behind.
+        pq.write_table(partition_schema(kwargs["partition_keys"]).empty_table(), str(path))
+    return rows
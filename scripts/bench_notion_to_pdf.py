@@ -0,0 +1,335 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.11"
+# dependencies = [
+#     "notion-client>=2.2.1",
+#     "weasyprint>=62.0",
+#     "markdown>=3.5",
+#     "requests>=2.31",
+#     "python-dotenv>=1.0",
+#     "Pillow>=10.0",
+# ]
+# ///
+"""
+Benchmarks for notion_to_pdf.py
+
+Times the pure-CPU hot paths against an in-memory fake Notion client, so
+the numbers measure Python CPU time only (no network, no rate limiting).
+Baselines are machine-specific: save one on the machine that compares.
+
+Usage:
+    uv run bench_notion_to_pdf.py [case ...] [--repeat 5]
+    uv run bench_notion_to_pdf.py --save-baseline bench-baseline.json
+    uv run bench_notion_to_pdf.py --baseline bench-baseline.json [--threshold 0.25]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import timeit
+from pathlib import Path
+from typing import Optional
+
+from notion_to_pdf import NotionToPDF, PageContent, RateLimiter, clean_page_id
+
+
+def _text(content: str, **annotations) -> dict:
+    return {
+        "plain_text": content,
+        "annotations": annotations,
+        "href": None,
+    }
+
+
+def _block(block_id: str, block_type: str, data: dict, has_children: bool = False) -> dict:
+    return {"id": block_id, "type": block_type, block_type: data, "has_children": has_children}
+
+
+class FakeNotionClient:
+    """Serve a synthetic page of every supported block type from memory."""
+
+    def __init__(self, blocks_per_page: int = 60):
+        self.blocks_per_page = blocks_per_page
+        self.table_rows = 20
+        self.table_cols = 4
+        self.blocks = self
+        self.children = self
+        self.pages = self
+
+    def retrieve(self, page_id: str) -> dict:
+        return {"properties": {"title": {"type": "title", "title": [_text(f"Page {page_id}")]}}}
+
+    # Defined above list(), which shadows the builtin in annotations below it.
+    def other_samples(self, block_id: str) -> list[dict]:
+        """One block of each type _sample() never produces."""
+        caption = [_text("A caption")]
+        return [
+            _block(f"{block_id}-h1", "heading_1", {"rich_text": [_text("Title")]}),
+            _block(f"{block_id}-h3", "heading_3", {"rich_text": [_text("Subsection")]}),
+            _block(f"{block_id}-hr", "divider", {}),
+            _block(
+                f"{block_id}-img",
+                "image",
+                {"type": "file", "file": {"url": "https://files.example.com/a.png"}, "caption": caption},
+            ),
+            _block(
+                f"{block_id}-img-ext",
+                "image",
+                {"type": "external", "external": {"url": "https://example.com/b.png"}, "caption": []},
+            ),
+            _block(f"{block_id}-bm", "bookmark", {"url": "https://example.com/post", "caption": caption}),
+            _block(f"{block_id}-embed", "embed", {"url": "https://example.com/embed"}),
+            _block(
+                f"{block_id}-row",
+                "table_row",
+                {"cells": [[_text(f"cell {c}")] for c in range(self.table_cols)]},
+            ),
+        ]
+
+    def list(self, block_id: str, start_cursor=None) -> dict:
+        if block_id.endswith("-table"):
+            rows = [
+                _block(
+                    f"{block_id}-r{i}",
+                    "table_row",
+                    {"cells": [[_text(f"cell {i}.{c}")] for c in range(self.table_cols)]},
+                )
+                for i in range(self.table_rows)
+            ]
+            return {"results": rows, "has_more": False}
+        if block_id.endswith("-toggle"):
+            return {"results": [self._paragraph(f"{block_id}-p", 0)], "has_more": False}
+        results = []
+        for i in range(self.blocks_per_page):
+            results.append(self._sample(f"{block_id}-{i}", i))
+        return {"results": results, "has_more": False}
+
+    def _paragraph(self, block_id: str, i: int) -> dict:
+        rich = [
+            _text("Plain text with <angle> & ampersand, "),
+            _text("bold", bold=True),
+            _text(" and "),
+            _text("italic code", italic=True, code=True),
+            {**_text(" a link"), "href": "https://example.com/docs?a=1&b=2"},
+            _text(f" #{i}\nsecond line."),
+        ]
+        return _block(block_id, "paragraph", {"rich_text": rich})
+
+    def _sample(self, block_id: str, i: int) -> dict:
+        kind = i % 10
+        if kind == 0:
+            return _block(block_id, "heading_2", {"rich_text": [_text(f"Section {i}")]})
+        if kind == 1:
+            return _block(block_id, "bulleted_list_item", {"rich_text": [_text(f"bullet {i}", bold=True)]})
+        if kind == 2:
+            return _block(block_id, "numbered_list_item", {"rich_text": [_text(f"step {i}")]})
+        if kind == 3:
+            return _block(block_id, "to_do", {"rich_text": [_text(f"task {i}")], "checked": i % 2 == 0})
+        if kind == 4:
+            code = "def f(x):\n    return x < 3 and x > 1\n" * 5
+            return _block(block_id, "code", {"rich_text": [_text(code)], "language": "python"})
+        if kind == 5:
+            return _block(block_id, "quote", {"rich_text": [_text(f"quoted {i}")]})
+        if kind == 6:
+            return _block(
+                block_id,
+                "callout",
+                {"rich_text": [_text(f"note {i}")], "icon": {"type": "emoji", "emoji": "⚠️"}},
+            )
+        if kind == 7 and i % 20 == 7:
+            return _block(
+                f"{block_id}-table",
+                "table",
+                {"table_width": 4, "has_column_header": True, "has_row_header": False},
+                has_children=True,
+            )
+        if kind == 8:
+            return _block(
+                f"{block_id}-toggle",
+                "toggle",
+                {"rich_text": [_text(f"toggle {i}")]},
+                has_children=True,
+            )
+        return self._paragraph(block_id, i)
+
+
+class _NoLimit(RateLimiter):
+    def wait_if_needed(self) -> None:
+        return None
+
+
+def make_converter(renderer: str, blocks_per_page: int) -> NotionToPDF:
+    converter = NotionToPDF(
+        "fake-token",
+        log_level="error",
+        notion_client=FakeNotionClient(blocks_per_page),
+        no_images=True,
+        max_workers=1,
+        renderer=renderer,
+    )
+    converter.rate_limiter = _NoLimit()
+    return converter
+
+
+def _synthetic_tree(chapters: int, blocks_per_page: int) -> PageContent:
+    """Build a PageContent tree of `chapters` pages with pre-fetched Markdown."""
+    converter = make_converter("markdown", blocks_per_page)
+    content = converter.get_page_content("sample")
+    root = PageContent(id=clean_page_id("0" * 32), title="Root", content=content)
+    parents = [root]
+    for n in range(1, chapters):
+        parent = parents[(n - 1) // 10]
+        page = PageContent(
+            id=clean_page_id(f"{n:032x}"),
+            title=f"Chapter {n}",
+            content=content,
+            level=parent.level + 1,
+        )
+        parent.children.append(page)
+        parents.append(page)
+    return root
+
+
+def case_rich_text(converter: NotionToPDF):
+    rich = converter.notion._paragraph("p", 1)["paragraph"]["rich_text"]
+    return lambda: converter.rich_text_to_markdown(rich)
+
+
+def case_block_to_markdown(converter: NotionToPDF):
+    # Kinds 0-9 of the fake client (i=7 is the table), plus every remaining type.
+    blocks = [converter.notion._sample(f"b-{i}", i) for i in range(10)]
+    blocks += converter.notion.other_samples("b")
+    # Images take the full path without touching the network.
+    converter.download_image = lambda url: f"notion-image:{'0' * 64}"
+
+    def run():
+        for block in blocks:
+            converter.block_to_markdown(block)
+
+    return run
+
+
+def case_render_table(converter: NotionToPDF):
+    converter.notion.table_rows = 500
+    converter.notion.table_cols = 8
+    return lambda: converter.render_table("big-table", {"has_column_header": True, "has_row_header": True})
+
+
+def case_links(converter: NotionToPDF):
+    urls = [
+        f"https://www.notion.so/workspace/Some-Page-Title-{n:032x}?pvs=4" for n in range(50)
+    ] + [f"Title-{n:032x}" for n in range(50)]
+    converter.page_ids = {clean_page_id(u).replace("-", "") for u in urls[::2]}
+
+    def run():
+        for url in urls:
+            converter.normalize_link(url)
+            clean_page_id(url)
+
+    return run
+
+
+def case_generate_toc(converter: NotionToPDF):
+    pages = converter.flatten_pages(_synthetic_tree(1000, 1))
+    return lambda: converter.generate_toc(pages)
+
+
+def case_generate_html(converter: NotionToPDF):
+    root = _synthetic_tree(1000, 5)
+    return lambda: converter.generate_html(root)
+
+
+def case_fetch_markdown(converter: NotionToPDF):
+    def run():
+        converter.content_to_html(converter.fetch_page_body("page"))
+
+    return run
+
+
+def case_fetch_html(converter: NotionToPDF):
+    converter.renderer = "html"
+    return case_fetch_markdown(converter)
+
+
+def case_render_pdf(converter: NotionToPDF):
+    converter.write_pdf("<p>warm-up</p>", os.devnull)
+    document = converter.generate_html(_synthetic_tree(5, 60))
+    return lambda: converter.write_pdf(document, os.devnull)
+
+
+# name -> (setup returning the callable to time, description)
+CASES = {
+    "rich_text_to_markdown": (case_rich_text, "one mixed-annotation paragraph"),
+    "block_to_markdown": (case_block_to_markdown, "18 blocks covering every type"),
+    "render_table": (case_render_table, "500x8 table via fake client"),
+    "links": (case_links, "100 normalize_link + clean_page_id"),
+    "generate_toc": (case_generate_toc, "1,000 chapters"),
+    "generate_html": (case_generate_html, "1,000 chapters x 5 blocks"),
+    "page_markdown": (case_fetch_markdown, "fetch + convert one 60-block page (Markdown)"),
+    "page_html": (case_fetch_html, "fetch + render one 60-block page (native HTML)"),
+    "render_pdf": (case_render_pdf, "WeasyPrint, 5 representative chapters"),
+}
+
+
+def run_case(name: str, repeat: int) -> Optional[float]:
+    """Median seconds per call for one case, or None if it cannot run here."""
+    setup, _ = CASES[name]
+    try:
+        fn = setup(make_converter("markdown", 60))
+    except (ImportError, OSError) as e:
+        print(f"{name:>22}: skipped ({e.__class__.__name__}: {e})", file=sys.stderr)
+        return None
+    timer = timeit.Timer(fn)
+    loops, _ = timer.autorange()
+    return statistics.median(t / loops for t in timer.repeat(repeat=repeat, number=loops))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark notion_to_pdf hot paths.")
+    parser.add_argument("cases", nargs="*", help=f"Cases to run (default: all): {', '.join(CASES)}")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repeats per case (default: 5)")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Write results as the new baseline JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="Compare against a baseline JSON and fail on regressions")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown vs baseline before failing, as a fraction (default: 0.25)",
+    )
+    args = parser.parse_args()
+
+    unknown = set(args.cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(sorted(unknown))}")
+    baseline = json.loads(Path(args.baseline).read_text()) if args.baseline else {}
+
+    results: dict[str, float] = {}
+    regressions = []
+    for name in args.cases or CASES:
+        seconds = run_case(name, args.repeat)
+        if seconds is None:
+            continue
+        results[name] = seconds
+        line = f"{name:>22}: {seconds * 1000:10.3f} ms/op  ({CASES[name][1]})"
+        if name in baseline:
+            change = seconds / baseline[name] - 1
+            line += f"  {change:+.0%} vs baseline"
+            if change > args.threshold:
+                regressions.append(name)
+                line += "  REGRESSION"
+        print(line, file=sys.stderr)
+
+    if "page_markdown" in results and "page_html" in results:
+        print(f"{'native HTML speedup':>22}: {results['page_markdown'] / results['page_html']:.1f}x", file=sys.stderr)
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline saved to {args.save_baseline}", file=sys.stderr)
+    if regressions:
+        print(f"Regressed past {args.threshold:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
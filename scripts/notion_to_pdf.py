@@ -8,6 +8,7 @@
 #     "requests>=2.31",
 #     "python-dotenv>=1.0",
 #     "Pillow>=10.0",
+#     "pypdf>=5.0",
 # ]
 # ///
 """
@@ -35,14 +36,27 @@ To get your Notion API key:
 import argparse
 import base64
 import concurrent.futures
+import contextlib
+import copy
+import cProfile
 import hashlib
+import itertools
+import json
+import multiprocessing
 import os
+import queue
 import re
+import shutil
+import sqlite3
 import sys
 import tempfile
 import threading
 import time
+import tracemalloc
+import zlib
 from dataclasses import dataclass, field
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from typing import Optional
 from urllib.parse import urlparse
@@ -97,15 +111,371 @@ class RateLimiter:
             self.last_request_time = time.time()
 
 
-@dataclass
+IMAGE_SCHEME = "notion-image"
+# Chapter links in cached fragments; rewritten to GoTo actions when merging.
+PAGE_LINK_SCHEME = "notion-page://"
+# Bump to invalidate cached chapter fragments after rendering changes.
+CHAPTER_CACHE_VERSION = "1"
+MERGED_TOC_CSS = ".toc a::after { content: leader('.') attr(data-page); }"
+_IMAGE_REF_RE = re.compile(rf"{IMAGE_SCHEME}:([0-9a-f]{{64}})")
+
+EXPORT_FORMATS = ["pdf", "split-pdf", "html", "markdown"]
+
+# Settings a batch job or server request may override (see NotionToPDF.derive).
+EXPORT_OPTIONS = (
+    "recursive",
+    "max_depth",
+    "split_files",
+    "include_toc",
+    "css_path",
+    "font_family",
+    "author",
+    "source_url",
+    "renderer",
+    "no_images",
+)
+RENDERERS = ("markdown", "html")
+
+MARKDOWN_EXTENSIONS = ["tables", "fenced_code", "toc", "nl2br"]
+
+_worker_md: Optional[markdown.Markdown] = None
+
+
+def _markdown_to_html(content: str) -> str:
+    """Convert Markdown to HTML in a pool worker, reusing one converter per process."""
+    global _worker_md
+    if _worker_md is None:
+        _worker_md = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+    page_html = _worker_md.convert(content)
+    _worker_md.reset()
+    return page_html
+
+
+# Block types rendered as list items, mapped to their enclosing list tag.
+_HTML_LIST_TAGS = {
+    "bulleted_list_item": "ul",
+    "numbered_list_item": "ol",
+    "to_do": 'ul class="todo-list"',
+}
+
+
+class PageStore:
+    """SQLite-backed blob store holding page contents outside the page tree.
+
+    Contents are zlib-compressed on write and read back only when a chapter
+    is rendered, so memory follows the shape of the tree, not its text.
+    Background-converted HTML is kept alongside in the same way.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS pages (id TEXT PRIMARY KEY, content BLOB)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS html (id TEXT PRIMARY KEY, content BLOB)")
+        self.lock = threading.Lock()
+
+    def put(self, page_id: str, content: str, table: str = "pages") -> None:
+        blob = zlib.compress(content.encode("utf-8"), 1)
+        with self.lock:
+            self.conn.execute(f"INSERT OR REPLACE INTO {table} VALUES (?, ?)", (page_id, blob))
+
+    def get(self, page_id: str, table: str = "pages") -> Optional[str]:
+        with self.lock:
+            row = self.conn.execute(f"SELECT content FROM {table} WHERE id = ?", (page_id,)).fetchone()
+        if row:
+            return zlib.decompress(row[0]).decode("utf-8")
+        return "" if table == "pages" else None
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+class Metrics:
+    """Run counters written as a Prometheus textfile-collector file."""
+
+    PREFIX = "notion_to_pdf_"
+    # name -> (type, help)
+    DESCRIPTIONS = {
+        "pages_fetched_total": ("counter", "Pages fetched from Notion."),
+        "api_calls_total": ("counter", "Rate-limited API/image calls by endpoint."),
+        "api_errors_total": ("counter", "Failed calls by endpoint and status."),
+        "retries_total": ("counter", "Retried calls by endpoint."),
+        "limiter_wait_seconds_total": ("counter", "Seconds spent waiting on the rate limiter."),
+        "image_cache_requests_total": ("counter", "Image lookups by cache result."),
+        "image_bytes_downloaded_total": ("counter", "Image bytes downloaded."),
+        "render_seconds_total": ("counter", "Seconds spent in WeasyPrint rendering."),
+        "pdfs_written_total": ("counter", "PDF files written."),
+        "peak_rss_bytes": ("gauge", "Peak resident set size of the process."),
+        "run_start_timestamp_seconds": ("gauge", "Unix time the run started."),
+        "last_update_timestamp_seconds": ("gauge", "Unix time this file was written."),
+        "run_success": ("gauge", "1 if the run finished successfully, 0 if it failed."),
+    }
+
+    def __init__(self):
+        self.values: dict[tuple[str, tuple[tuple[str, str], ...]], float] = {}
+        self.lock = threading.Lock()
+        self.set("run_start_timestamp_seconds", time.time())
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        with self.lock:
+            self.values[(name, tuple(sorted(labels.items())))] = value
+
+    def render(self) -> str:
+        self.set("peak_rss_bytes", _peak_rss_bytes())
+        self.set("last_update_timestamp_seconds", time.time())
+        with self.lock:
+            items = sorted(self.values.items())
+        lines = []
+        described = set()
+        for (name, labels), value in items:
+            metric = self.PREFIX + name
+            if name not in described:
+                kind, help_text = self.DESCRIPTIONS.get(name, ("untyped", name))
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} {kind}")
+                described.add(name)
+            label_str = ",".join(f'{k}="{v}"' for k, v in labels)
+            lines.append(f"{metric}{{{label_str}}} {value!r}" if label_str else f"{metric} {value!r}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str) -> None:
+        """Write atomically so the node exporter never reads a partial file."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        Path(tmp_path).write_text(self.render(), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def start_writer(self, path: str, interval: float) -> threading.Event:
+        """Rewrite the textfile every `interval` seconds until the event is set."""
+        stop = threading.Event()
+
+        def loop() -> None:
+            while not stop.wait(interval):
+                try:
+                    self.write_textfile(path)
+                except OSError:
+                    pass
+
+        threading.Thread(target=loop, name="metrics-writer", daemon=True).start()
+        return stop
+
+
+class PhaseProfiler:
+    """Per-phase tracemalloc snapshots, optionally with a cProfile dump each.
+
+    For every phase it records the traced-memory peak, the memory still
+    held when the phase ends, and the call sites that retained the most.
+    cProfile only sees the thread that runs the phase, not worker threads.
+    """
+
+    def __init__(self, top: int = 8, profile_dir: Optional[str] = None, frames: int = 1):
+        self.top = top
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        if self.profile_dir:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+        self.results: list[dict] = []
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        before = self._snapshot()
+        start_current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        profiler = cProfile.Profile() if self.profile_dir else None
+        start = time.monotonic()
+        if profiler:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler:
+                profiler.disable()
+                profiler.dump_stats(str(self.profile_dir / f"{re.sub(r'[^a-z0-9_-]+', '_', name)}.prof"))
+            current, peak = tracemalloc.get_traced_memory()
+            after = self._snapshot()
+            self.results.append({
+                "phase": name,
+                "seconds": time.monotonic() - start,
+                "peak": peak - start_current,
+                "retained": current - start_current,
+                "sites": after.compare_to(before, "lineno")[: self.top],
+            })
+
+    def note(self, name: str, retained: int) -> None:
+        """Record a figure measured directly rather than by snapshots."""
+        self.results.append({"phase": name, "seconds": 0.0, "peak": retained, "retained": retained, "sites": []})
+
+    def report(self) -> str:
+        mb = 1024 * 1024
+        lines = [
+            "Memory profile (tracemalloc):",
+            f"  {'phase':<24} {'peak MB':>9} {'retained MB':>12} {'wall s':>8}",
+        ]
+        for result in self.results:
+            lines.append(
+                f"  {result['phase']:<24} {result['peak'] / mb:>9.1f}"
+                f" {result['retained'] / mb:>12.1f} {result['seconds']:>8.1f}"
+            )
+        for result in self.results:
+            if not result["sites"]:
+                continue
+            lines.append("")
+            lines.append(f"Top retained allocations in {result['phase']}:")
+            for stat in result["sites"]:
+                frame = stat.traceback[0]
+                lines.append(
+                    f"  {stat.size_diff / mb:>+9.2f} MB {stat.count_diff:>+8} blocks"
+                    f"  {frame.filename}:{frame.lineno}"
+                )
+        return "\n".join(lines)
+
+
+def _peak_rss_bytes() -> int:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on in-flight requests, driven by throttling and latency.
+
+    The limit grows by roughly one slot per round of successful calls while
+    latency stays near its baseline, and is halved on a 429 or when latency
+    climbs past twice the baseline.
+    """
+
+    def __init__(
+        self,
+        initial: int = 2,
+        minimum: int = 1,
+        maximum: int = 10,
+        name: str = "",
+        log=None,
+        cooldown: float = 1.0,
+    ):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.name = name
+        self.log = log
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.baseline: Optional[float] = None
+        self.last_decrease = 0.0
+        self.cond = threading.Condition()
+
+    def acquire(self) -> None:
+        with self.cond:
+            while self.in_flight >= int(self.limit):
+                self.cond.wait()
+            self.in_flight += 1
+
+    def release(self, latency: Optional[float], throttled: bool = False) -> None:
+        with self.cond:
+            self.in_flight -= 1
+            if throttled:
+                self._decrease("throttled")
+            elif latency is not None:
+                if self.baseline is None:
+                    self.baseline = latency
+                else:
+                    # Drops immediately to faster samples, drifts up slowly.
+                    self.baseline = min(latency, 0.95 * self.baseline + 0.05 * latency)
+                if latency > 2 * self.baseline:
+                    self._decrease(f"latency {latency:.2f}s vs baseline {self.baseline:.2f}s")
+                elif self.limit < self.maximum:
+                    self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self.cond.notify_all()
+
+    def _decrease(self, reason: str) -> None:
+        now = time.monotonic()
+        # One cut per cooldown, so a burst of slow responses counts once.
+        if now - self.last_decrease < self.cooldown:
+            return
+        self.last_decrease = now
+        self.limit = max(float(self.minimum), self.limit / 2)
+        if self.log:
+            self.log(f"{self.name} concurrency cut to {int(self.limit)} ({reason})", "debug")
+
+
+@dataclass(slots=True)
 class PageContent:
-    """Represents a Notion page with its content and children."""
+    """Represents a Notion page with its content and children.
+
+    When a PageStore is attached, `content` is empty and the text is read
+    from the store by load_content().
+    """
     id: str
     title: str
     content: str
     level: int = 0
     children: list["PageContent"] = field(default_factory=list)
     page_number: int = 0
+    html_future: Optional[concurrent.futures.Future[str]] = field(default=None, repr=False)
+    store: Optional[PageStore] = field(default=None, repr=False)
+
+    def load_content(self) -> str:
+        """Return the page content, reading it from the page store if offloaded."""
+        if self.store is not None:
+            return self.store.get(self.id)
+        return self.content
+
+    def load_html(self) -> Optional[str]:
+        """Return background-converted HTML, or None if the page was not converted ahead."""
+        future = self.html_future
+        if future is not None:
+            return future.result()
+        if self.store is not None:
+            return self.store.get(self.id, "html")
+        return None
+
+    def _offload_html(self, future: concurrent.futures.Future[str]) -> None:
+        # Done callback: move the result into the store so the tree doesn't hold every page's HTML.
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.store.put(self.id, future.result(), "html")
+        self.html_future = None
+
+
+@dataclass(slots=True)
+class PlanNode:
+    """Hierarchy-only summary of a page, used by --plan."""
+    id: str
+    title: str
+    level: int = 0
+    blocks: int = 0
+    list_calls: int = 0
+    nested: int = 0
+    tables: int = 0
+    image_urls: list[str] = field(default_factory=list)
+    children: list["PlanNode"] = field(default_factory=list)
+
+    def api_calls(self, recursive: bool) -> int:
+        """Estimated Notion calls to export this page alone."""
+        # Title + content listing + one listing per nested block/table,
+        # plus the separate child-page listing in recursive mode.
+        listing = max(self.list_calls, 1)
+        return 1 + listing * (2 if recursive else 1) + self.nested + self.tables
 
 
 class NotionToPDF:
@@ -125,31 +495,61 @@ class NotionToPDF:
         author: Optional[str] = None,
         source_url: Optional[str] = None,
         notion_client: Optional[Client] = None,
+        rate_limiter: Optional[RateLimiter] = None,
         image_cache_dir: Optional[str] = None,
         image_workers: int = 1,
         split_files: bool = False,
         max_workers: int = 4,
+        adaptive: bool = False,
+        renderer: str = "markdown",
+        convert_workers: int = 1,
+        page_store: Optional[str] = None,
+        chapter_cache_dir: Optional[str] = None,
+        discovery: str = "blocks",
+        profiler: Optional[PhaseProfiler] = None,
     ):
         self.notion = notion_client or Client(auth=notion_token)
-        self.rate_limiter = RateLimiter(max_requests_per_second=3.0)
+        self.rate_limiter = rate_limiter or RateLimiter(max_requests_per_second=3.0)
+        self.metrics = Metrics()
+        self.profiler = profiler
+        self.http = requests.Session()
         self.image_cache: dict[str, str] = {}
+        self.image_blobs: dict[str, tuple[bytes, str]] = {}
+        # WeasyPrint's decoded-image cache, shared by every document we render.
+        self.render_cache: dict = {}
         self.image_futures: dict[str, concurrent.futures.Future[tuple[Optional[bytes], str]]] = {}
         self.image_cache_dir = Path(image_cache_dir) if image_cache_dir else None
         if self.image_cache_dir:
             self.image_cache_dir.mkdir(parents=True, exist_ok=True)
         self.image_workers = max(1, image_workers)
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=max(self.image_workers, 10))
+        self.http.mount("https://", adapter)
+        self.http.mount("http://", adapter)
         self.executor = None
         if self.image_workers > 1:
             self.executor = concurrent.futures.ThreadPoolExecutor(
                 max_workers=self.image_workers,
                 thread_name_prefix="notion-img",
             )
-        self.max_workers = max(1, min(max_workers, 10))  # Cap at 10 to respect rate limits
+        # Cap at 10 to respect rate limits; adaptive mode lets the controller decide.
+        self.max_workers = max(1, min(max_workers, 32 if adaptive else 10))
+        self.api_concurrency = None
+        self.image_concurrency = None
+        if adaptive:
+            self.api_concurrency = AdaptiveConcurrency(maximum=self.max_workers, name="notion", log=self.log)
+            self.image_concurrency = AdaptiveConcurrency(maximum=self.image_workers, name="images", log=self.log)
         self.page_executor = concurrent.futures.ThreadPoolExecutor(
             max_workers=self.max_workers,
             thread_name_prefix="notion-page",
         )
         self.temp_dir = tempfile.mkdtemp()
+        self.chapter_cache_dir = Path(chapter_cache_dir) if chapter_cache_dir else None
+        if self.chapter_cache_dir:
+            self.chapter_cache_dir.mkdir(parents=True, exist_ok=True)
+        # page_store: SQLite path for offloaded page contents ("" = temp file).
+        self.page_store = None
+        if page_store is not None:
+            self.page_store = PageStore(page_store or os.path.join(self.temp_dir, "pages.sqlite"))
         self.verbose = verbose
         self.log_level = "debug" if verbose else log_level.lower()
         self.recursive = recursive
@@ -162,6 +562,45 @@ class NotionToPDF:
         self.source_url = source_url
         self.page_ids: set[str] = set()
         self.split_files = split_files
+        self.renderer = renderer
+        self.stylesheets: dict[str, object] = {}
+        self.progress = {"stage": "idle", "pages": 0}
+        self.progress_lock = threading.Lock()
+        # Watch mode: per-page title/content/child ids reused across rebuilds.
+        self.page_cache: Optional[dict[str, dict]] = None
+        self.page_parents: dict[str, str] = {}
+        self.page_dirs: dict[str, tuple[Path, int]] = {}
+        # "blocks": list each page's children; "search": enumerate pages via search once.
+        self.discovery = discovery
+        self.discovered: Optional[dict[str, dict]] = None
+        self.discovery_lock = threading.Lock()
+        self.convert_executor = None
+        if renderer == "markdown" and convert_workers > 1:
+            # Markdown conversion is pure-Python CPU work, so use processes, not threads.
+            # Workers start lazily from fetch threads, so never fork() this multithreaded
+            # process: forkserver/spawn start them from a clean interpreter.
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self.convert_executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=convert_workers, mp_context=multiprocessing.get_context(method)
+            )
+        self.html_renderers = {
+            "paragraph": self._html_paragraph,
+            "heading_1": self._html_heading,
+            "heading_2": self._html_heading,
+            "heading_3": self._html_heading,
+            "bulleted_list_item": self._html_list_item,
+            "numbered_list_item": self._html_list_item,
+            "to_do": self._html_to_do,
+            "toggle": self._html_toggle,
+            "code": self._html_code,
+            "quote": self._html_quote,
+            "callout": self._html_callout,
+            "divider": self._html_divider,
+            "image": self._html_image,
+            "bookmark": self._html_bookmark,
+            "embed": self._html_embed,
+            "table": self._html_table,
+        }
 
     def log(self, message: str, level: str = "info") -> None:
         """Emit logs filtered by level."""
@@ -171,29 +610,66 @@ class NotionToPDF:
         if target <= current:
             print(f"[{level.upper()}] {message}", file=sys.stderr)
 
-    def _with_retry(self, fn, *, desc: str, max_attempts: int = 3, sleep_base: float = 0.5):
-        """Execute fn with basic retry/backoff on transient errors."""
+    def _with_retry(
+        self,
+        fn,
+        *,
+        desc: str,
+        max_attempts: int = 3,
+        sleep_base: float = 0.5,
+        concurrency: Optional["AdaptiveConcurrency"] = None,
+        endpoint: str = "other",
+    ):
+        """Execute fn with basic retry/backoff on transient errors.
+
+        Calls hold a slot of `concurrency` (the Notion API controller by
+        default) and report their latency or throttling back to it. The slot
+        is released before a retry backs off.
+        """
+        concurrency = concurrency or self.api_concurrency
         attempt = 0
+        delay = 0.0
         while True:
+            if delay:
+                # Back off without a slot: after a 429 the controller has just shrunk the limit.
+                time.sleep(delay)
+            if concurrency:
+                concurrency.acquire()
+            latency = None
+            throttled = False
             try:
+                wait_start = time.monotonic()
                 self.rate_limiter.wait_if_needed()
-                return fn()
+                start = time.monotonic()
+                self.metrics.inc("limiter_wait_seconds_total", start - wait_start)
+                self.metrics.inc("api_calls_total", endpoint=endpoint)
+                result = fn()
+                latency = time.monotonic() - start
+                return result
             except APIResponseError as e:
+                throttled = e.status == 429
+                self.metrics.inc("api_errors_total", endpoint=endpoint, status=str(e.status))
                 if e.status in (429, 500, 502, 503, 504) and attempt < max_attempts - 1:
+                    self.metrics.inc("retries_total", endpoint=endpoint)
                     delay = sleep_base * (2 ** attempt)
                     self.log(f"Retrying {desc} after {delay:.1f}s due to {e.status}", "warn")
-                    time.sleep(delay)
                     attempt += 1
                     continue
                 raise
             except requests.RequestException as e:
+                status = getattr(e.response, "status_code", None)
+                throttled = status == 429
+                self.metrics.inc("api_errors_total", endpoint=endpoint, status=str(status or "network"))
                 if attempt < max_attempts - 1:
+                    self.metrics.inc("retries_total", endpoint=endpoint)
                     delay = sleep_base * (2 ** attempt)
                     self.log(f"Retrying {desc} after {delay:.1f}s due to network error {e}", "warn")
-                    time.sleep(delay)
                     attempt += 1
                     continue
                 raise
+            finally:
+                if concurrency:
+                    concurrency.release(latency, throttled)
 
     def get_page_title(self, page_id: str) -> str:
         """Get the title of a Notion page."""
@@ -201,23 +677,60 @@ class NotionToPDF:
         page = self._with_retry(
             lambda: self.notion.pages.retrieve(page_id=page_id),
             desc=f"page title for {page_id}",
+            endpoint="pages.retrieve",
         )
-        properties = page.get("properties", {})
-        
-        # Try different title property names
-        for prop_name in ["title", "Title", "Name", "name"]:
-            if prop_name in properties:
-                title_prop = properties[prop_name]
-                if title_prop.get("type") == "title":
-                    title_array = title_prop.get("title", [])
-                    if title_array:
-                        return "".join(t.get("plain_text", "") for t in title_array)
-        
-        # Fallback: try to get from page title directly
-        if "title" in page:
-            return "".join(t.get("plain_text", "") for t in page["title"])
-        
-        return "Untitled"
+        return page_title(page)
+
+    def discover_pages(self) -> dict[str, dict]:
+        """Enumerate every page the integration can see via the search API.
+
+        Returns {"children": parent id -> child ids, "titles": id -> title},
+        rebuilt from each page's parent field at 100 pages per call. Only
+        pages whose parent is another page are linked; pages under
+        databases or nested inside blocks are left out, matching what
+        get_child_pages finds.
+        """
+        children: dict[str, list[tuple[str, str]]] = {}
+        titles: dict[str, str] = {}
+        start_cursor = None
+        calls = 0
+        while True:
+            kwargs = {"filter": {"property": "object", "value": "page"}, "page_size": 100}
+            if start_cursor:
+                kwargs["start_cursor"] = start_cursor
+            response = self._with_retry(
+                lambda: self.notion.search(**kwargs),
+                desc="search for page discovery",
+                endpoint="search",
+            )
+            calls += 1
+            for page in response.get("results", []):
+                if page.get("archived") or page.get("in_trash"):
+                    continue
+                titles[page["id"]] = page_title(page)
+                parent = page.get("parent", {})
+                if parent.get("type") == "page_id":
+                    children.setdefault(parent["page_id"], []).append(
+                        (page.get("created_time", ""), page["id"])
+                    )
+            if not response.get("has_more"):
+                break
+            start_cursor = response.get("next_cursor")
+        self.log(f"Discovered {len(titles)} pages with {calls} search calls")
+        # Search does not expose block order; creation order is the closest match.
+        return {
+            "children": {pid: [cid for _, cid in sorted(kids)] for pid, kids in children.items()},
+            "titles": titles,
+        }
+
+    def _discovered(self) -> Optional[dict[str, dict]]:
+        """Run search discovery once, on first use, when --discovery search is set."""
+        if self.discovery != "search":
+            return None
+        with self.discovery_lock:
+            if self.discovered is None:
+                self.discovered = self.discover_pages()
+        return self.discovered
 
     def get_child_pages(self, page_id: str) -> list[str]:
         """Get all child page IDs of a page."""
@@ -231,6 +744,7 @@ class NotionToPDF:
                     block_id=page_id, start_cursor=start_cursor
                 ),
                 desc=f"child pages for {page_id}",
+                endpoint="blocks.children.list",
             )
             for block in response.get("results", []):
                 if block.get("type") == "child_page":
@@ -244,7 +758,12 @@ class NotionToPDF:
         return child_pages
 
     def download_image(self, url: str) -> Optional[str]:
-        """Download an image and return its base64 data URI."""
+        """Download an image and return a reference for <img src>.
+
+        Images are stored once per content hash and referenced as
+        notion-image:<sha256>; write_pdf resolves those through its URL
+        fetcher so identical images are decoded and embedded only once.
+        """
         if self.no_images:
             self.log(f"Skipping image (disabled): {url}", "debug")
             return None
@@ -253,12 +772,15 @@ class NotionToPDF:
             self.log("Image already embedded as data URI; skipping download", "debug")
             return url
         if url in self.image_cache:
+            self.metrics.inc("image_cache_requests_total", result="memory_hit")
             return self.image_cache[url]
 
         cache_hit = self._load_image_from_disk(url)
         if cache_hit:
-            self.image_cache[url] = cache_hit
-            return cache_hit
+            self.metrics.inc("image_cache_requests_total", result="disk_hit")
+            ref = self._store_image(*cache_hit)
+            self.image_cache[url] = ref
+            return ref
 
         try:
             if self.executor:
@@ -272,21 +794,32 @@ class NotionToPDF:
 
             if content is None or not isinstance(content, (bytes, bytearray)):
                 return None
+            self.metrics.inc("image_cache_requests_total", result="miss")
 
-            data_uri = self._encode_image(bytes(content), str(content_type))
-            self.image_cache[url] = data_uri
+            ref = self._store_image(bytes(content), str(content_type))
+            self.image_cache[url] = ref
             self._save_image_to_disk(url, bytes(content), str(content_type))
-            return data_uri
+            return ref
         except Exception as e:
             self.log(f"Warning: Failed to download image {url}: {e}", "warn")
             return None
 
     def _download_image_bytes(self, url: str) -> tuple[Optional[bytes], str]:
+        def fetch() -> requests.Response:
+            response = self.http.get(url, timeout=30)
+            if response.status_code == 429 or response.status_code >= 500:
+                # Surface throttling and server errors to the retry loop.
+                response.raise_for_status()
+            return response
+
         response = self._with_retry(
-            lambda: requests.get(url, timeout=30),
+            fetch,
             desc=f"image {url}",
+            endpoint="image",
+            concurrency=self.image_concurrency,
         )
         response.raise_for_status()
+        self.metrics.inc("image_bytes_downloaded_total", len(response.content))
         content_type = response.headers.get("content-type", "image/png")
         if ";" in content_type:
             content_type = content_type.split(";")[0]
@@ -296,6 +829,58 @@ class NotionToPDF:
         b64_data = base64.b64encode(content).decode("utf-8")
         return f"data:{content_type};base64,{b64_data}"
 
+    def _store_image(self, content: bytes, content_type: str) -> str:
+        digest = hashlib.sha256(content).hexdigest()
+        self.image_blobs.setdefault(digest, (content, content_type))
+        return f"{IMAGE_SCHEME}:{digest}"
+
+    def clear_image_state(self) -> None:
+        """Drop in-memory images and decoded renders; the disk cache is kept.
+
+        Derived converters share these dicts, so they are emptied in place.
+        """
+        self.image_cache.clear()
+        self.image_blobs.clear()
+        self.image_futures.clear()
+        self.render_cache.clear()
+
+    def inline_images(self, document: str) -> str:
+        """Replace notion-image: references with data URIs for standalone output."""
+        def to_data_uri(match: re.Match) -> str:
+            blob = self.image_blobs.get(match.group(1))
+            return self._encode_image(*blob) if blob else match.group(0)
+
+        return _IMAGE_REF_RE.sub(to_data_uri, document)
+
+    def _url_fetcher(self):
+        """Build a WeasyPrint URL fetcher serving deduplicated images from memory."""
+        _import_weasyprint()
+        import weasyprint  # type: ignore
+
+        blobs = self.image_blobs
+        prefix = f"{IMAGE_SCHEME}:"
+
+        if hasattr(weasyprint, "URLFetcher"):
+            # Newer WeasyPrint releases take URLFetcher instances.
+            from weasyprint.urls import URLFetcherResponse  # type: ignore
+
+            class ImageFetcher(weasyprint.URLFetcher):
+                def fetch(self, url, headers=None):
+                    if url.startswith(prefix):
+                        content, content_type = blobs[url[len(prefix):]]
+                        return URLFetcherResponse(url, content, {"Content-Type": content_type})
+                    return super().fetch(url, headers)
+
+            return ImageFetcher()
+
+        def fetch(url: str, *args, **kwargs) -> dict:
+            if url.startswith(prefix):
+                content, content_type = blobs[url[len(prefix):]]
+                return {"string": content, "mime_type": content_type}
+            return weasyprint.default_url_fetcher(url, *args, **kwargs)
+
+        return fetch
+
     def _cache_paths(self, url: str) -> tuple[Optional[Path], Optional[Path]]:
         if not self.image_cache_dir:
             return None, None
@@ -305,7 +890,7 @@ class NotionToPDF:
             self.image_cache_dir / f"{digest}.ct",
         )
 
-    def _load_image_from_disk(self, url: str) -> Optional[str]:
+    def _load_image_from_disk(self, url: str) -> Optional[tuple[bytes, str]]:
         data_path, ct_path = self._cache_paths(url)
         if not data_path or not data_path.exists():
             return None
@@ -314,7 +899,7 @@ class NotionToPDF:
             content_type = "image/png"
             if ct_path and ct_path.exists():
                 content_type = ct_path.read_text(encoding="utf-8").strip() or content_type
-            return self._encode_image(content, content_type)
+            return content, content_type
         except OSError:
             return None
 
@@ -466,10 +1051,9 @@ class NotionToPDF:
                 return f"#page-{page_id}"
         return href
 
-    def render_table(self, block_id: str, table_data: dict, indent: int = 0) -> str:
-        """Render a Notion table block (excluding databases)."""
-        rows: list[list[str]] = []
-        indent_str = "    " * indent
+    def _fetch_table_rows(self, block_id: str) -> list[list[list]]:
+        """Fetch the raw rich-text cells of every row in a table block."""
+        rows: list[list[list]] = []
         start_cursor = None
         has_more = True
         while has_more:
@@ -478,17 +1062,23 @@ class NotionToPDF:
                     block_id=block_id, start_cursor=start_cursor
                 ),
                 desc=f"table rows for {block_id}",
+                endpoint="blocks.children.list",
             )
             for row_block in response.get("results", []):
                 if row_block.get("type") != "table_row":
                     continue
-                cells = row_block.get("table_row", {}).get("cells", [])
-                row = []
-                for cell in cells:
-                    row.append(self.rich_text_to_markdown(cell))
-                rows.append(row)
+                rows.append(row_block.get("table_row", {}).get("cells", []))
             has_more = response.get("has_more", False)
             start_cursor = response.get("next_cursor")
+        return rows
+
+    def render_table(self, block_id: str, table_data: dict, indent: int = 0) -> str:
+        """Render a Notion table block (excluding databases)."""
+        indent_str = "    " * indent
+        rows = [
+            [self.rich_text_to_markdown(cell) for cell in cells]
+            for cells in self._fetch_table_rows(block_id)
+        ]
 
         if not rows:
             return ""
@@ -516,6 +1106,281 @@ class NotionToPDF:
 
         return "\n".join(lines) + "\n\n"
 
+    def rich_text_to_html(self, rich_text: list) -> str:
+        """Convert Notion rich text to HTML, escaping the text exactly once."""
+        result = []
+        for text in rich_text:
+            content = escape(text.get("plain_text", ""), quote=False).replace("\n", "<br>")
+            annotations = text.get("annotations", {})
+
+            if annotations.get("code"):
+                content = f"<code>{content}</code>"
+            if annotations.get("bold"):
+                content = f"<strong>{content}</strong>"
+            if annotations.get("italic"):
+                content = f"<em>{content}</em>"
+            if annotations.get("strikethrough"):
+                content = f"<del>{content}</del>"
+            if annotations.get("underline"):
+                content = f"<u>{content}</u>"
+
+            if text.get("href"):
+                href = escape(self.normalize_link(text["href"]))
+                content = f'<a href="{href}">{content}</a>'
+
+            result.append(content)
+
+        return "".join(result)
+
+    def blocks_to_html(self, blocks: list[dict]) -> str:
+        """Render a list of sibling blocks, grouping list items into lists."""
+        parts = []
+        open_list = None
+        for block in blocks:
+            block_type = block.get("type")
+            list_tag = _HTML_LIST_TAGS.get(block_type)
+            if list_tag != open_list:
+                if open_list:
+                    parts.append(f"</{open_list.split()[0]}>")
+                if list_tag:
+                    parts.append(f"<{list_tag}>")
+                open_list = list_tag
+            renderer = self.html_renderers.get(block_type)
+            if renderer:
+                parts.append(renderer(block, block.get(block_type, {})))
+            elif block.get("children"):
+                # Layout containers (column_list, column, synced_block, ...) just hold content.
+                parts.append(self._html_children(block))
+        if open_list:
+            parts.append(f"</{open_list.split()[0]}>")
+        return "".join(parts)
+
+    def _html_children(self, block: dict) -> str:
+        return self.blocks_to_html(block.get("children", []))
+
+    def _html_paragraph(self, block: dict, data: dict) -> str:
+        text = self.rich_text_to_html(data.get("rich_text", []))
+        children = self._html_children(block)
+        if children:
+            children = f'<div class="indented">{children}</div>'
+        return f"<p>{text}</p>{children}" if text else children
+
+    def _html_heading(self, block: dict, data: dict) -> str:
+        level = int(block["type"][-1])
+        text = self.rich_text_to_html(data.get("rich_text", []))
+        return f"<h{level}>{text}</h{level}>{self._html_children(block)}"
+
+    def _html_list_item(self, block: dict, data: dict) -> str:
+        text = self.rich_text_to_html(data.get("rich_text", []))
+        return f"<li>{text}{self._html_children(block)}</li>"
+
+    def _html_to_do(self, block: dict, data: dict) -> str:
+        text = self.rich_text_to_html(data.get("rich_text", []))
+        box = "&#9745;" if data.get("checked") else "&#9744;"
+        return f"<li>{box} {text}{self._html_children(block)}</li>"
+
+    def _html_toggle(self, block: dict, data: dict) -> str:
+        text = self.rich_text_to_html(data.get("rich_text", []))
+        return f"<details><summary>{text}</summary>{self._html_children(block)}</details>"
+
+    def _html_code(self, block: dict, data: dict) -> str:
+        code = escape("".join(t.get("plain_text", "") for t in data.get("rich_text", [])), quote=False)
+        language = escape(data.get("language", ""))
+        return f'<pre><code class="language-{language}">{code}</code></pre>'
+
+    def _html_quote(self, block: dict, data: dict) -> str:
+        text = self.rich_text_to_html(data.get("rich_text", []))
+        return f"<blockquote><p>{text}</p>{self._html_children(block)}</blockquote>"
+
+    def _html_callout(self, block: dict, data: dict) -> str:
+        text = self.rich_text_to_html(data.get("rich_text", []))
+        icon = data.get("icon") or {}
+        emoji = icon.get("emoji", "💡") if icon.get("type") == "emoji" else "💡"
+        return (
+            f'<blockquote class="callout"><p>{emoji} {text}</p>'
+            f"{self._html_children(block)}</blockquote>"
+        )
+
+    def _html_divider(self, block: dict, data: dict) -> str:
+        return "<hr>"
+
+    def _html_image(self, block: dict, data: dict) -> str:
+        image_url = None
+        if data.get("type") == "external":
+            image_url = data.get("external", {}).get("url")
+        elif data.get("type") == "file":
+            image_url = data.get("file", {}).get("url")
+        if not image_url:
+            return ""
+        data_uri = self.download_image(image_url)
+        if not data_uri:
+            return ""
+        caption_rich = data.get("caption", [])
+        if caption_rich:
+            alt = escape("".join(t.get("plain_text", "") for t in caption_rich))
+            caption = self.rich_text_to_html(caption_rich)
+            return (
+                f'<figure><img src="{data_uri}" alt="{alt}">'
+                f"<figcaption>{caption}</figcaption></figure>"
+            )
+        return f'<img src="{data_uri}" alt="image">'
+
+    def _html_bookmark(self, block: dict, data: dict) -> str:
+        url = data.get("url", "")
+        caption = self.rich_text_to_html(data.get("caption", []))
+        return f'<p><a href="{escape(url)}">{caption or escape(url)}</a></p>'
+
+    def _html_embed(self, block: dict, data: dict) -> str:
+        url = data.get("url", "")
+        return f'<p><a href="{escape(url)}">Embedded content</a></p>'
+
+    def _html_table(self, block: dict, data: dict) -> str:
+        rows = self._fetch_table_rows(block["id"])
+        if not rows:
+            return ""
+
+        has_col_header = data.get("has_column_header", False)
+        has_row_header = data.get("has_row_header", False)
+
+        def format_row(cells: list[list], cell_tag: str) -> str:
+            out = []
+            for i, cell in enumerate(cells):
+                tag = "th" if cell_tag == "th" or (has_row_header and i == 0) else "td"
+                out.append(f"<{tag}>{self.rich_text_to_html(cell)}</{tag}>")
+            return f"<tr>{''.join(out)}</tr>"
+
+        parts = ["<table>"]
+        body_rows = rows
+        if has_col_header:
+            parts.append(f"<thead>{format_row(rows[0], 'th')}</thead>")
+            body_rows = rows[1:]
+        parts.append("<tbody>")
+        parts.extend(format_row(row, "td") for row in body_rows)
+        parts.append("</tbody></table>")
+        return "".join(parts)
+
+    def get_block_tree(self, block_id: str) -> list[dict]:
+        """Fetch the blocks under block_id, attaching nested blocks as "children"."""
+        blocks = []
+        has_more = True
+        cursor = None
+        while has_more:
+            kwargs = {"block_id": block_id}
+            if cursor:
+                kwargs["start_cursor"] = cursor
+            response = self._with_retry(
+                lambda: self.notion.blocks.children.list(**kwargs),
+                desc=f"blocks for {block_id}",
+                endpoint="blocks.children.list",
+            )
+            self.log(
+                f"Fetched {len(response.get('results', []))} blocks"
+                f" (has_more={response.get('has_more', False)}) for {block_id}"
+            )
+            for block in response.get("results", []):
+                # Tables fetch their own rows; child pages are rendered as chapters.
+                if block.get("has_children") and block.get("type") not in (
+                    "table",
+                    "child_page",
+                    "child_database",
+                ):
+                    block["children"] = self.get_block_tree(block["id"])
+                blocks.append(block)
+            has_more = response.get("has_more", False)
+            cursor = response.get("next_cursor")
+        return blocks
+
+    def get_page_html(self, page_id: str) -> str:
+        """Get all content from a Notion page rendered directly to HTML."""
+        return self.blocks_to_html(self.get_block_tree(page_id))
+
+    def fetch_page_body(self, page_id: str) -> str:
+        """Fetch page content in the format selected by the renderer."""
+        if self.renderer == "html":
+            return self.get_page_html(page_id)
+        return self.get_page_content(page_id)
+
+    def content_to_html(self, content: str, md_converter: Optional[markdown.Markdown] = None) -> str:
+        """Turn fetched page content into HTML, converting Markdown if needed."""
+        if self.renderer == "html":
+            return content
+        if self.convert_executor and md_converter is None:
+            return self.convert_executor.submit(_markdown_to_html, content).result()
+        md_converter = md_converter or markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+        page_html = md_converter.convert(content)
+        md_converter.reset()
+        return page_html
+
+    def submit_conversion(self, content: str) -> Optional[concurrent.futures.Future[str]]:
+        """Start converting content to HTML in the background, if a pool is configured."""
+        if not self.convert_executor:
+            return None
+        return self.convert_executor.submit(_markdown_to_html, content)
+
+    def close(self) -> None:
+        """Release worker pools."""
+        if self.convert_executor:
+            self.convert_executor.shutdown(cancel_futures=True)
+            self.convert_executor = None
+        if self.executor:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+        if self.page_store:
+            self.page_store.close()
+            self.page_store = None
+        self.http.close()
+
+    def derive(self, **options) -> "NotionToPDF":
+        """Return a converter for another export that shares this one's client,
+        rate limiter, HTTP session, image caches and worker pools.
+
+        Only the settings in EXPORT_OPTIONS may differ; anything else (pools,
+        clients, caches, worker counts) belongs to the shared converter.
+        """
+        for name in options:
+            if name not in EXPORT_OPTIONS:
+                raise ValueError(f"Unknown export option: {name}")
+        if options.get("renderer", self.renderer) not in RENDERERS:
+            raise ValueError(f"Unknown renderer: {options['renderer']}")
+        job = copy.copy(self)
+        for name, value in options.items():
+            setattr(job, name, value)
+        # Bound to self, so rebind or the job would render with this converter's settings.
+        job.html_renderers = {kind: getattr(job, fn.__name__) for kind, fn in self.html_renderers.items()}
+        job.page_ids = set()
+        job.page_parents = {}
+        job.page_dirs = {}
+        job.progress = {"stage": "queued", "pages": 0}
+        return job
+
+    def generate_batch(self, jobs: list[dict], parallel_jobs: int = 3) -> list[tuple[dict, Optional[Exception]]]:
+        """Run several exports in this process against one shared API budget.
+
+        Jobs run concurrently so the shared rate limiter always has requests
+        queued; each job dict holds page_id, output and optional overrides.
+        """
+        def run(job: dict) -> None:
+            options = {k: v for k, v in job.items() if k not in ("page_id", "output")}
+            converter = self.derive(**options)
+            converter.generate_pdf(clean_page_id(job["page_id"]), job["output"])
+
+        results: list[tuple[dict, Optional[Exception]]] = []
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, parallel_jobs),
+            thread_name_prefix="notion-job",
+        ) as pool:
+            futures = {pool.submit(run, job): job for job in jobs}
+            for future in concurrent.futures.as_completed(futures):
+                job = futures[future]
+                try:
+                    future.result()
+                    self.log(f"Finished batch job {job['page_id']} -> {job['output']}")
+                    results.append((job, None))
+                except Exception as e:
+                    self.log(f"Batch job {job['page_id']} failed: {e}", "error")
+                    results.append((job, e))
+        return results
+
     def get_page_content(self, page_id: str) -> str:
         """Get all content from a Notion page as Markdown."""
         content_parts = []
@@ -532,11 +1397,13 @@ class NotionToPDF:
                             block_id=block_id, start_cursor=cursor
                         ),
                         desc=f"blocks for {block_id}",
+                        endpoint="blocks.children.list",
                     )
                 else:
                     response = self._with_retry(
                         lambda: self.notion.blocks.children.list(block_id=block_id),
                         desc=f"blocks for {block_id}",
+                        endpoint="blocks.children.list",
                     )
                 self.log(
                     f"Fetched {len(response.get('results', []))} blocks"
@@ -565,18 +1432,57 @@ class NotionToPDF:
         fetch_blocks(page_id)
         return "".join(content_parts)
 
+    def _fetch_page(self, page_id: str) -> tuple[str, str]:
+        """Fetch a page's title and content, reusing the watch cache when warm."""
+        entry = self.page_cache.get(page_id) if self.page_cache is not None else None
+        if entry is None:
+            # A full search only pays off when a tree is being walked.
+            discovered = self._discovered() if self.recursive else self.discovered
+            title = discovered["titles"].get(page_id) if discovered else None
+            entry = {
+                "title": title or self.get_page_title(page_id),
+                "content": self.fetch_page_body(page_id),
+                "children": None,
+            }
+            self._note_page_fetched()
+            if self.page_cache is not None:
+                self.page_cache[page_id] = entry
+        return entry["title"], entry["content"]
+
+    def _child_page_ids(self, page_id: str) -> list[str]:
+        """List child pages (cached in watch mode) and remember their parent."""
+        entry = self.page_cache.get(page_id) if self.page_cache is not None else None
+        if entry is not None and entry["children"] is not None:
+            return entry["children"]
+        discovered = self._discovered()
+        if discovered:
+            child_page_ids = list(discovered["children"].get(page_id, []))
+        else:
+            child_page_ids = self.get_child_pages(page_id)
+        if entry is not None:
+            entry["children"] = child_page_ids
+        for child_id in child_page_ids:
+            self.page_parents[child_id] = page_id
+        return child_page_ids
+
     def build_page_tree(self, page_id: str, level: int = 0) -> PageContent:
         """Build a tree of pages starting from the given page."""
         self.log(f"Building page tree for {page_id} at level {level}")
-        title = self.get_page_title(page_id)
-        content = self.get_page_content(page_id)
+        title, content = self._fetch_page(page_id)
         
         page = PageContent(
             id=page_id,
             title=title,
-            content=content,
+            content="" if self.page_store else content,
             level=level,
+            store=self.page_store,
         )
+        if self.page_store:
+            self.page_store.put(page_id, content)
+        # Convert while the rest of the tree is still being fetched.
+        page.html_future = self.submit_conversion(content)
+        if page.html_future and self.page_store:
+            page.html_future.add_done_callback(page._offload_html)
         
         if self.recursive:
             if self.max_depth is not None and level >= self.max_depth:
@@ -586,7 +1492,7 @@ class NotionToPDF:
                 )
                 return page
             # Get child pages
-            child_page_ids = self.get_child_pages(page_id)
+            child_page_ids = self._child_page_ids(page_id)
             self.log(f"Found {len(child_page_ids)} child pages for {page_id}")
             
             # Fetch children in parallel
@@ -613,22 +1519,35 @@ class NotionToPDF:
         
         return page
 
+    def iter_pages(self, page: PageContent):
+        """Yield the page tree depth-first, in reading order, without recursion."""
+        stack = [page]
+        while stack:
+            current = stack.pop()
+            yield current
+            stack.extend(reversed(current.children))
+
     def flatten_pages(self, page: PageContent) -> list[PageContent]:
         """Flatten the page tree into a list for sequential rendering."""
-        pages = [page]
-        for child in page.children:
-            pages.extend(self.flatten_pages(child))
-        return pages
+        return list(self.iter_pages(page))
+
+    def generate_toc(self, pages: list[PageContent], page_numbers: Optional[dict[str, int]] = None) -> str:
+        """Generate table of contents HTML.
 
-    def generate_toc(self, pages: list[PageContent]) -> str:
-        """Generate table of contents HTML."""
+        With page_numbers (used when merging cached chapters) entries carry
+        explicit numbers and cross-document links instead of target-counter().
+        """
         toc_items = []
         for page in pages:
             indent = "    " * page.level
-            toc_items.append(
-                f'{indent}<li class="toc-level-{page.level}">'
-                f'<a href="#page-{page.id}">{page.title}</a></li>'
-            )
+            if page_numbers is None:
+                link = f'<a href="#page-{page.id}">{page.title}</a>'
+            else:
+                link = (
+                    f'<a href="{PAGE_LINK_SCHEME}{page.id}" data-page="{page_numbers[page.id]}">'
+                    f"{page.title}</a>"
+                )
+            toc_items.append(f'{indent}<li class="toc-level-{page.level}">{link}</li>')
         
         return f"""
         <nav class="toc">
@@ -639,15 +1558,7 @@ class NotionToPDF:
         </nav>
         """
 
-    def generate_html(self, root_page: PageContent) -> str:
-        """Generate the full HTML document."""
-        pages = self.flatten_pages(root_page)
-        self.page_ids = {p.id.replace("-", "") for p in pages}
-        
-        # Generate TOC
-        toc_html = self.generate_toc(pages) if self.include_toc else ""
-
-        # Front matter (optional)
+    def _front_matter_html(self) -> str:
         front_matter_parts = []
         if self.author or self.source_url:
             front_matter_parts.append("<section class=\"front-matter\">")
@@ -657,55 +1568,178 @@ class NotionToPDF:
             if self.source_url:
                 front_matter_parts.append(f"<li><strong>Source:</strong> <a href=\"{self.source_url}\">{self.source_url}</a></li>")
             front_matter_parts.append("</ul></section>")
-        front_matter_html = "".join(front_matter_parts)
+        return "".join(front_matter_parts)
+
+    def _chapter_html(self, page: PageContent, md_converter: Optional[markdown.Markdown] = None) -> str:
+        heading_level = min(page.level + 1, 6)
         
-        # Generate content for each page
-        content_parts = []
-        md_converter = markdown.Markdown(
-            extensions=["tables", "fenced_code", "toc", "nl2br"]
-        )
+        # Convert markdown to HTML (no-op for the native renderer)
+        page_html = page.load_html()
+        if page_html is None:
+            page_html = self.content_to_html(page.load_content(), md_converter)
         
-        for i, page in enumerate(pages):
-            page.page_number = i + 1
-            heading_level = min(page.level + 1, 6)
-            
-            # Convert markdown to HTML
-            page_html = md_converter.convert(page.content)
-            md_converter.reset()
-            
-            content_parts.append(f"""
+        return f"""
             <section class="chapter" id="page-{page.id}">
                 <h{heading_level} class="chapter-title">{page.title}</h{heading_level}>
                 <div class="chapter-content">
                     {page_html}
                 </div>
             </section>
-            """)
-        
-        # Full HTML document
-        html = f"""
+            """
+
+    def _book_document(self, title: str, front_html: str, content_html: str, title_page: bool = True) -> str:
+        header = f"""<header class="book-title">
+                <h1>{title}</h1>
+            </header>""" if title_page else ""
+        return f"""
         <!DOCTYPE html>
         <html lang="en">
         <head>
             <meta charset="UTF-8">
-            <title>{root_page.title}</title>
+            <title>{title}</title>
         </head>
         <body>
-            <header class="book-title">
-                <h1>{root_page.title}</h1>
-            </header>
+            {header}
             
-            {front_matter_html}
-            {toc_html}
+            {front_html}
             
             <main class="book-content">
-                {"".join(content_parts)}
+                {content_html}
             </main>
         </body>
         </html>
         """
+
+    def generate_html(self, root_page: PageContent) -> str:
+        """Generate the full HTML document."""
+        pages = self.flatten_pages(root_page)
+        self.page_ids = {p.id.replace("-", "") for p in pages}
         
-        return html
+        # Generate TOC
+        toc_html = self.generate_toc(pages) if self.include_toc else ""
+        
+        # Generate content for each page
+        content_parts = []
+        md_converter = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+        
+        for i, page in enumerate(pages):
+            page.page_number = i + 1
+            content_parts.append(self._chapter_html(page, md_converter))
+        
+        return self._book_document(
+            root_page.title,
+            self._front_matter_html() + toc_html,
+            "".join(content_parts),
+        )
+
+    def write_pdf_incremental(self, root_page: PageContent, output_path: str) -> None:
+        """Render each chapter to a cached PDF fragment and merge them.
+
+        Fragments are keyed by chapter HTML, stylesheet and starting page
+        number, so an edit re-renders only the edited chapter (plus later
+        ones if its page count changed). The title page and TOC are rendered
+        last with real page numbers, and cross-chapter #page- links are
+        turned into GoTo actions when merging.
+        """
+        from pypdf import PdfReader  # type: ignore
+
+        pages = self.flatten_pages(root_page)
+        self.page_ids = {p.id.replace("-", "") for p in pages}
+        md_converter = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+        chapters = []
+        for i, page in enumerate(pages):
+            page.page_number = i + 1
+            chapter = self._chapter_html(page, md_converter)
+            chapters.append((page.id, chapter.replace('href="#page-', f'href="{PAGE_LINK_SCHEME}')))
+        front_html = self._front_matter_html()
+
+        def render_front(numbers: dict[str, int]) -> tuple[Path, int]:
+            toc_html = self.generate_toc(pages, numbers) if self.include_toc else ""
+            document = self._book_document(root_page.title, front_html + toc_html, "")
+            path = Path(self.temp_dir) / f"front-{root_page.id}.pdf"
+            self.write_pdf(document, str(path), extra_css=MERGED_TOC_CSS)
+            return path, len(PdfReader(str(path)).pages)
+
+        front_path, front_count = render_front({page.id: 0 for page in pages})
+        for _ in range(3):
+            fragments = []
+            numbers = {}
+            start = front_count + 1
+            for page_id, chapter in chapters:
+                numbers[page_id] = start
+                path = self._chapter_fragment(root_page.title, chapter, start)
+                count = len(PdfReader(str(path)).pages)
+                fragments.append((page_id, path))
+                start += count
+            front_path, count = render_front(numbers)
+            if count == front_count:
+                break
+            # The TOC grew or shrank a page; shift chapter numbering and retry.
+            front_count = count
+
+        self._merge_fragments(front_path, fragments, output_path)
+
+    def _chapter_fragment(self, title: str, chapter_html: str, start_page: int) -> Path:
+        """Return the cached PDF for one chapter, rendering it on a cache miss."""
+        css = self.get_css()
+        key = hashlib.sha256(
+            f"{CHAPTER_CACHE_VERSION}\0{start_page}\0{css}\0{chapter_html}".encode("utf-8")
+        ).hexdigest()
+        path = self.chapter_cache_dir / f"{key}.pdf"
+        if path.exists():
+            self.log(f"Chapter cache hit at page {start_page}", "debug")
+            return path
+        first_page_css = f"@page :first {{ counter-set: page {start_page}; }}"
+        if not self.css_path:
+            # The default stylesheet blanks the first page's footer for the title page.
+            first_page_css = (
+                f"@page :first {{ counter-set: page {start_page};"
+                " @bottom-center { content: counter(page); }"
+                " @bottom-right { content: string(chapter-title); } }"
+            )
+        document = self._book_document(title, "", chapter_html, title_page=False)
+        # Per-writer tmp name: concurrent jobs may render the same chapter at once.
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        self.write_pdf(document, str(tmp_path), extra_css=first_page_css)
+        os.replace(tmp_path, path)
+        return path
+
+    def _merge_fragments(self, front_path: Path, fragments: list[tuple[str, Path]], output_path: str) -> None:
+        """Concatenate front matter and chapter PDFs, resolving chapter links."""
+        from pypdf import PdfWriter  # type: ignore
+        from pypdf.generic import ArrayObject, DictionaryObject, NameObject  # type: ignore
+
+        writer = PdfWriter()
+        writer.append(str(front_path))
+        starts: dict[str, int] = {}
+        for page_id, path in fragments:
+            starts[page_id] = len(writer.pages)
+            writer.append(str(path))
+
+        for pdf_page in writer.pages:
+            for annot_ref in pdf_page.get("/Annots", []) or []:
+                annot = annot_ref.get_object()
+                action = annot.get("/A")
+                if not action or action.get("/S") != "/URI":
+                    continue
+                uri = str(action.get("/URI", ""))
+                if not uri.startswith(PAGE_LINK_SCHEME):
+                    continue
+                target = starts.get(uri[len(PAGE_LINK_SCHEME):].rstrip("/"))
+                if target is None:
+                    continue
+                annot[NameObject("/A")] = DictionaryObject({
+                    NameObject("/S"): NameObject("/GoTo"),
+                    NameObject("/D"): ArrayObject([
+                        writer.pages[target].indirect_reference,
+                        NameObject("/Fit"),
+                    ]),
+                })
+
+        # Each fragment embeds its own copy of shared images and fonts; keep one of each.
+        writer.compress_identical_objects()
+        with open(output_path, "wb") as f:
+            writer.write(f)
 
     def get_css(self) -> str:
         """Get the CSS for the PDF."""
@@ -920,6 +1954,15 @@ class NotionToPDF:
         li {
             margin: 0.3em 0;
         }
+
+        ul.todo-list {
+            list-style: none;
+            padding-left: 0.5em;
+        }
+
+        .indented {
+            margin-left: 1.5em;
+        }
         
         a {
             color: #0066cc;
@@ -956,8 +1999,44 @@ class NotionToPDF:
 
         return css_template.replace("{FONT_FAMILY}", font_family)
 
-    def generate_pdf(self, page_id: str, output_path: str) -> None:
-        """Generate PDF(s) from a Notion page."""
+    def _stylesheet(self):
+        """Return the parsed stylesheet, parsing each distinct CSS text only once."""
+        _, CSS = _import_weasyprint()
+        css_text = self.get_css()
+        css = self.stylesheets.get(css_text)
+        if css is None:
+            css = self.stylesheets[css_text] = CSS(string=css_text)
+        return css
+
+    def write_pdf(self, html_content: str, pdf_path: str, extra_css: str = "") -> None:
+        """Render an HTML document to a PDF file."""
+        HTML, CSS = _import_weasyprint()
+        stylesheets = [self._stylesheet()]
+        if extra_css:
+            stylesheets.append(CSS(string=extra_css))
+        start = time.monotonic()
+        HTML(string=html_content, url_fetcher=self._url_fetcher()).write_pdf(
+            pdf_path,
+            stylesheets=stylesheets,
+            cache=self.render_cache,
+        )
+        self.metrics.inc("render_seconds_total", time.monotonic() - start)
+        self.metrics.inc("pdfs_written_total")
+
+    def _phase(self, name: str):
+        """Profile a pipeline phase when --profile-memory is on."""
+        return self.profiler.phase(name) if self.profiler else contextlib.nullcontext()
+
+    def _set_stage(self, stage: str) -> None:
+        self.progress["stage"] = stage
+
+    def _note_page_fetched(self) -> None:
+        with self.progress_lock:
+            self.progress["pages"] += 1
+        self.metrics.inc("pages_fetched_total")
+
+    def generate_pdf(self, page_id: str, output_path: str) -> str:
+        """Generate PDF(s) from a Notion page and return where they were written."""
 
         if self.split_files:
             # Multi-file mode: fetch and generate PDFs immediately as we traverse
@@ -967,24 +2046,301 @@ class NotionToPDF:
                 output_dir = output_dir.parent
             output_dir.mkdir(parents=True, exist_ok=True)
             print(f"Generating individual PDFs in: {output_dir}", file=sys.stderr)
-            self.generate_page_pdfs_streaming(page_id, output_dir)
+            self._set_stage("exporting")
+            with self._phase("split export"):
+                self.generate_page_pdfs_streaming(page_id, output_dir)
             print(f"\n✅ PDFs saved to: {output_dir}", file=sys.stderr)
+            return str(output_dir)
         else:
             # Single-file mode: build tree then combine all into one PDF
             print(f"Fetching page tree from Notion...", file=sys.stderr)
-            root_page = self.build_page_tree(page_id)
+            self._set_stage("fetching")
+            with self._phase("build_page_tree"):
+                root_page = self.build_page_tree(page_id)
+            if self.profiler:
+                # Downloads run inside the fetch phase; report what the image store holds.
+                self.profiler.note("image download (held)", sum(len(c) for c, _ in self.image_blobs.values()))
             output_path = self._resolve_output_path(output_path, root_page.title)
             
             print(f"Generating HTML...", file=sys.stderr)
-            html_content = self.generate_html(root_page)
+            self._set_stage("generating html")
+            with self._phase("generate_html"):
+                html_content = "" if self.chapter_cache_dir else self.generate_html(root_page)
             
             print(f"Converting to PDF...", file=sys.stderr)
-            HTML, CSS = _import_weasyprint()
-            html = HTML(string=html_content)
-            css = CSS(string=self.get_css())
-            
-            html.write_pdf(output_path, stylesheets=[css])
+            self._set_stage("rendering")
+            with self._phase("write_pdf"):
+                if self.chapter_cache_dir:
+                    self.write_pdf_incremental(root_page, output_path)
+                else:
+                    self.write_pdf(html_content, output_path)
             print(f"PDF saved to: {output_path}", file=sys.stderr)
+            return output_path
+
+    def plan(self, page_id: str, title: Optional[str] = None, level: int = 0) -> PlanNode:
+        """Walk only the page hierarchy, counting blocks, images and children.
+
+        Costs one block listing per page (titles come from child_page blocks)
+        and never fetches nested content or images.
+        """
+        node = PlanNode(id=page_id, title=title or self.get_page_title(page_id), level=level)
+        child_pages: list[tuple[str, str]] = []
+        start_cursor = None
+        has_more = True
+        while has_more:
+            response = self._with_retry(
+                lambda: self.notion.blocks.children.list(block_id=page_id, start_cursor=start_cursor),
+                desc=f"plan listing for {page_id}",
+                endpoint="blocks.children.list",
+            )
+            node.list_calls += 1
+            for block in response.get("results", []):
+                block_type = block.get("type")
+                node.blocks += 1
+                if block_type == "child_page":
+                    child_pages.append((block["id"], block.get("child_page", {}).get("title", "Untitled")))
+                elif block_type == "table":
+                    node.tables += 1
+                elif block_type == "image" and not self.no_images:
+                    image = block.get("image", {})
+                    url = image.get(image.get("type", ""), {}).get("url")
+                    if url:
+                        node.image_urls.append(url)
+                elif block.get("has_children") and block_type != "child_database":
+                    node.nested += 1
+            has_more = response.get("has_more", False)
+            start_cursor = response.get("next_cursor")
+
+        if not self.recursive or (self.max_depth is not None and level >= self.max_depth):
+            return node
+        if child_pages and self.max_workers > 1:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                node.children = list(executor.map(
+                    lambda child: self.plan(child[0], child[1], level + 1), child_pages
+                ))
+        else:
+            node.children = [self.plan(child_id, child_title, level + 1) for child_id, child_title in child_pages]
+        return node
+
+    def _image_size(self, url: str) -> Optional[int]:
+        """Image size from the disk cache, else a HEAD request; None if unknown."""
+        data_path, _ = self._cache_paths(url)
+        if data_path and data_path.exists():
+            return data_path.stat().st_size
+        try:
+            response = self.http.head(url, timeout=10, allow_redirects=True)
+            length = response.headers.get("content-length")
+            return int(length) if response.ok and length else None
+        except (requests.RequestException, ValueError):
+            return None
+
+    def format_plan(self, root: PlanNode, top: int = 10) -> str:
+        """Summarize a plan: totals, projected time and the costliest subtrees."""
+        nodes = []
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            nodes.append(node)
+            stack.extend(node.children)
+
+        # (calls, pages, depth) per subtree, filled bottom-up.
+        totals: dict[int, tuple[int, int, int]] = {}
+        for node in reversed(nodes):
+            calls = node.api_calls(self.recursive) + len(node.image_urls)
+            pages = 1
+            depth = 0
+            for child in node.children:
+                c, p, d = totals[id(child)]
+                calls += c
+                pages += p
+                depth = max(depth, d + 1)
+            totals[id(node)] = (calls, pages, depth)
+
+        def subtree(node: PlanNode) -> tuple[int, int, int]:
+            return totals[id(node)]
+
+        image_urls = [url for node in nodes for url in node.image_urls]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(self.image_workers, 4)) as pool:
+            sizes = list(pool.map(self._image_size, set(image_urls)))
+        known = [size for size in sizes if size is not None]
+        total_calls, total_pages, _ = subtree(root)
+        rate = self.rate_limiter.max_requests_per_second
+        minutes, secs = divmod(int(total_calls / rate), 60)
+        hours, minutes = divmod(minutes, 60)
+        planning_calls = sum(node.list_calls for node in nodes) + 1
+
+        lines = [
+            f"Plan for {root.title}",
+            f"  Pages:               {total_pages}",
+            f"  Top-level blocks:    {sum(n.blocks for n in nodes)}"
+            f" ({sum(n.nested for n in nodes)} with nested blocks, {sum(n.tables for n in nodes)} tables)",
+            f"  Estimated API calls: {total_calls} (this plan used {planning_calls})",
+            f"  Images:              {len(image_urls)} ({len(set(image_urls))} unique,"
+            f" ~{sum(known) / 1_000_000:.1f} MB known, {len(sizes) - len(known)} unknown size)",
+            f"  Projected time:      {hours}:{minutes:02d}:{secs:02d}"
+            f" at {rate:g} req/s",
+        ]
+        if root.children:
+            ranked = sorted(
+                (n for n in nodes if n is not root),
+                key=lambda n: subtree(n)[0],
+                reverse=True,
+            )[:top]
+            lines.append("")
+            lines.append("Most expensive subtrees (consider --max-depth):")
+            lines.append(f"  {'calls':>7} {'pages':>6} {'depth':>5}  title")
+            for node in ranked:
+                calls, pages, depth = subtree(node)
+                lines.append(f"  {calls:>7} {pages:>6} {depth:>5}  {'  ' * (node.level - 1)}{node.title}")
+        return "\n".join(lines)
+
+    def poll_changes(self, since: str, seen: dict[str, str]) -> list[dict]:
+        """Return pages edited at or after `since` that differ from `seen`.
+
+        Uses the search endpoint sorted by last_edited_time (newest first) and
+        stops paging once results are older than the cursor. `seen` is pruned
+        to the pages this poll returned: older ones can only come back with a
+        newer edit time, so keeping them would only grow it forever.
+        """
+        changed = []
+        returned = set()
+        start_cursor = None
+        while True:
+            kwargs = {
+                "filter": {"property": "object", "value": "page"},
+                "sort": {"direction": "descending", "timestamp": "last_edited_time"},
+                "page_size": 100,
+            }
+            if start_cursor:
+                kwargs["start_cursor"] = start_cursor
+            response = self._with_retry(
+                lambda: self.notion.search(**kwargs),
+                desc="search for edited pages",
+                endpoint="search",
+            )
+            results = response.get("results", [])
+            done = not response.get("has_more") or not results
+            for page in results:
+                edited = page.get("last_edited_time", "")
+                if edited < since:
+                    done = True
+                    break
+                returned.add(page["id"])
+                if seen.get(page["id"]) != edited:
+                    changed.append(page)
+            if done:
+                for page_id in seen.keys() - returned:
+                    del seen[page_id]
+                return changed
+            start_cursor = response.get("next_cursor")
+
+    def _in_export(self, page: dict) -> bool:
+        """True if a page is part of the exported tree or a new child of it."""
+        parent = page.get("parent", {})
+        return (
+            page["id"] in self.page_cache
+            or (parent.get("type") == "page_id" and parent.get("page_id") in self.page_cache)
+        )
+
+    def _left_export(self, page: dict, root_id: str) -> bool:
+        """True if a changed page was trashed or moved out of the exported tree."""
+        if page.get("archived") or page.get("in_trash"):
+            return True
+        parent = page.get("parent", {})
+        in_tree = parent.get("type") == "page_id" and parent.get("page_id") in self.page_cache
+        return page["id"] != root_id and not in_tree
+
+    def watch(self, page_id: str, output_path: str, interval: float = 120.0) -> None:
+        """Export once, then re-export only what changed on each poll."""
+        self.page_cache = {}
+        seen: dict[str, str] = {}
+        # Notion rounds last_edited_time to the minute; start the cursor there.
+        cursor = time.strftime("%Y-%m-%dT%H:%M:00.000Z", time.gmtime())
+        written = self.generate_pdf(page_id, output_path)
+        self.log(f"Watching {page_id} for edits every {interval:.0f}s")
+        while True:
+            time.sleep(interval)
+            edited = self.poll_changes(cursor, seen)
+            for page in edited:
+                seen[page["id"]] = page["last_edited_time"]
+                cursor = max(cursor, page["last_edited_time"])
+            changed = [page for page in edited if self._in_export(page)]
+            if not changed:
+                self.log("No changes since last poll", "debug")
+                continue
+            self.log(f"{len(changed)} changed page(s); re-exporting")
+            gone = {page["id"] for page in changed if self._left_export(page, page_id)}
+            old_titles = {}
+            for page in changed:
+                entry = self.page_cache.pop(page["id"], None)
+                if entry is not None:
+                    old_titles[page["id"]] = entry["title"]
+                # A new, moved or removed child changes its new and old parents' child lists.
+                for parent_id in (page.get("parent", {}).get("page_id"), self.page_parents.get(page["id"])):
+                    if parent_id in self.page_cache:
+                        self.page_cache[parent_id]["children"] = None
+            if self.discovered is not None:
+                # Search discovery is a snapshot; new, moved or renamed pages need a fresh one.
+                with self.discovery_lock:
+                    self.discovered = None
+            if self.split_files:
+                for changed_id, old_title in old_titles.items():
+                    new_title = None if changed_id in gone else self._fetch_page(changed_id)[0]
+                    self._move_split_output(changed_id, old_title, new_title)
+                self._reexport_split_pages([page for page in changed if page["id"] not in gone], Path(written))
+            else:
+                self.generate_pdf(page_id, output_path)
+
+    def _move_split_output(self, page_id: str, old_title: str, new_title: Optional[str]) -> None:
+        """Follow a rename (or removal, new_title=None) in split-files output.
+
+        The old-title PDF is deleted; the folder holding the page's children
+        is renamed with it, or deleted along with the page.
+        """
+        if page_id not in self.page_dirs:
+            return
+        page_dir, _ = self.page_dirs[page_id]
+        old_name = self._sanitize_filename(old_title)
+        new_name = self._sanitize_filename(new_title) if new_title is not None else None
+        if new_name == old_name:
+            return
+        (page_dir / f"{old_name}.pdf").unlink(missing_ok=True)
+        old_dir = page_dir / old_name
+        new_dir = page_dir / new_name if new_name else None
+        if new_dir is None:
+            if old_dir.is_dir():
+                shutil.rmtree(old_dir)
+            del self.page_dirs[page_id]
+        elif old_dir.is_dir() and not new_dir.exists():
+            old_dir.rename(new_dir)
+        else:
+            return
+        for other_id, (other_dir, level) in list(self.page_dirs.items()):
+            if other_dir == old_dir or old_dir in other_dir.parents:
+                if new_dir is None:
+                    del self.page_dirs[other_id]
+                else:
+                    self.page_dirs[other_id] = (new_dir / other_dir.relative_to(old_dir), level)
+
+    def _reexport_split_pages(self, changed: list[dict], output_dir: Path) -> None:
+        """Regenerate per-page PDFs for changed pages only (split-files mode)."""
+        single = self.derive(recursive=False)
+        for page in changed:
+            page_id = page["id"]
+            if page_id in self.page_dirs:
+                page_dir, level = self.page_dirs[page_id]
+                single.generate_page_pdfs_streaming(page_id, output_dir, page_dir, level)
+                continue
+            parent_id = page.get("parent", {}).get("page_id")
+            if parent_id not in self.page_dirs:
+                continue
+            # New child page: export it (and its subtree) under the parent's folder.
+            parent_dir, parent_level = self.page_dirs[parent_id]
+            parent_title, _ = self._fetch_page(parent_id)
+            child_dir = parent_dir / self._sanitize_filename(parent_title)
+            child_dir.mkdir(parents=True, exist_ok=True)
+            self.page_parents[page_id] = parent_id
+            self.generate_page_pdfs_streaming(page_id, output_dir, child_dir, parent_level + 1)
 
     def _resolve_output_path(self, output_path: str, title: str) -> str:
         """If output is a directory, derive filename from title."""
@@ -1009,8 +2365,7 @@ class NotionToPDF:
         """Fetch page and generate PDF immediately, then recurse to children."""
         # Fetch page data
         print(f"Fetching page {page_id}...", file=sys.stderr)
-        title = self.get_page_title(page_id)
-        content = self.get_page_content(page_id)
+        title, content = self._fetch_page(page_id)
         
         # Determine the directory for this page's PDF
         if parent_path is None:
@@ -1019,6 +2374,7 @@ class NotionToPDF:
         else:
             # Child pages go in a subdirectory named after their parent
             page_dir = parent_path
+        self.page_dirs[page_id] = (page_dir, level)
         
         # Generate filename from page title
         filename = self._sanitize_filename(title) + ".pdf"
@@ -1029,10 +2385,7 @@ class NotionToPDF:
         
         # Convert to PDF immediately
         print(f"✓ Generating {pdf_path}", file=sys.stderr)
-        HTML, CSS = _import_weasyprint()
-        html = HTML(string=html_content)
-        css = CSS(string=self.get_css())
-        html.write_pdf(str(pdf_path), stylesheets=[css])
+        self.write_pdf(html_content, str(pdf_path))
         
         # Check if we should recurse to children
         if self.recursive:
@@ -1044,7 +2397,7 @@ class NotionToPDF:
                 return
             
             # Get child pages
-            child_page_ids = self.get_child_pages(page_id)
+            child_page_ids = self._child_page_ids(page_id)
             
             if child_page_ids:
                 # Create subdirectory for children
@@ -1077,11 +2430,8 @@ class NotionToPDF:
 
     def _generate_single_page_html_from_content(self, title: str, content: str) -> str:
         """Generate HTML for a single page from title and markdown content."""
-        # Convert markdown to HTML
-        md_converter = markdown.Markdown(
-            extensions=["tables", "fenced_code", "toc", "nl2br"]
-        )
-        page_html = md_converter.convert(content)
+        # Convert markdown to HTML (no-op for the native renderer)
+        page_html = self.content_to_html(content)
         
         # Build front matter if configured
         front_matter_parts = []
@@ -1125,6 +2475,16 @@ class NotionToPDF:
 
     def generate_page_pdfs(self, page: PageContent, output_dir: Path, parent_path: Optional[Path] = None) -> None:
         """Generate individual PDF files for each page in the tree."""
+        self.generate_page_files(
+            page,
+            output_dir,
+            ".pdf",
+            lambda p, path: self.write_pdf(self._generate_single_page_html(p), str(path)),
+            parent_path,
+        )
+
+    def generate_page_files(self, page: PageContent, output_dir: Path, suffix: str, write, parent_path: Optional[Path] = None) -> None:
+        """Write one file per page with write(page, path), subpages in subdirectories."""
         # Determine the directory for this page
         if parent_path is None:
             # Root page goes directly in output_dir
@@ -1134,18 +2494,11 @@ class NotionToPDF:
             page_dir = parent_path
         
         # Generate filename from page title
-        filename = self._sanitize_filename(page.title) + ".pdf"
-        pdf_path = page_dir / filename
+        filename = self._sanitize_filename(page.title) + suffix
+        file_path = page_dir / filename
         
-        # Generate HTML for this single page (without children)
-        html_content = self._generate_single_page_html(page)
-        
-        # Convert to PDF
-        self.log(f"Writing {pdf_path}", "info")
-        HTML, CSS = _import_weasyprint()
-        html = HTML(string=html_content)
-        css = CSS(string=self.get_css())
-        html.write_pdf(str(pdf_path), stylesheets=[css])
+        self.log(f"Writing {file_path}", "info")
+        write(page, file_path)
         
         # Process children in subdirectories
         if page.children:
@@ -1155,15 +2508,77 @@ class NotionToPDF:
             child_dir.mkdir(parents=True, exist_ok=True)
             
             for child in page.children:
-                self.generate_page_pdfs(child, output_dir, child_dir)
+                self.generate_page_files(child, output_dir, suffix, write, child_dir)
+
+    def export_formats(self, page_id: str, output_path: str, formats: list[str]) -> dict[str, str]:
+        """Fetch the page tree once and write every requested format from it.
+
+        Formats: "pdf" (combined book at output_path), "split-pdf", "html"
+        and "markdown" (one file per page, in <book>-pages/, <book>-html/
+        and <book>-md/ next to the book). Returns format -> written path.
+        """
+        unknown = set(formats) - set(EXPORT_FORMATS)
+        if unknown:
+            raise ValueError(f"Unknown format(s): {', '.join(sorted(unknown))}")
+        if "markdown" in formats and self.renderer == "html":
+            raise ValueError("Markdown output needs --renderer markdown")
+
+        print(f"Fetching page tree from Notion...", file=sys.stderr)
+        self._set_stage("fetching")
+        root_page = self.build_page_tree(page_id)
+        book_path = Path(self._resolve_output_path(output_path, root_page.title))
+        book_path.parent.mkdir(parents=True, exist_ok=True)
+        written: dict[str, str] = {}
+
+        if "pdf" in formats:
+            self._set_stage("rendering")
+            if self.chapter_cache_dir:
+                self.write_pdf_incremental(root_page, str(book_path))
+            else:
+                self.write_pdf(self.generate_html(root_page), str(book_path))
+            written["pdf"] = str(book_path)
+        else:
+            # Still needed to map internal links to anchors.
+            self.page_ids = {p.id.replace("-", "") for p in self.flatten_pages(root_page)}
+
+        def target(suffix: str) -> Path:
+            directory = book_path.with_name(f"{book_path.stem}-{suffix}")
+            directory.mkdir(parents=True, exist_ok=True)
+            written[fmt] = str(directory)
+            return directory
+
+        for fmt in formats:
+            if fmt == "split-pdf":
+                self.generate_page_pdfs(root_page, target("pages"))
+            elif fmt == "html":
+                css = self.get_css()
+
+                def write_html(page: PageContent, path: Path) -> None:
+                    document = self._generate_single_page_html(page)
+                    document = document.replace("</head>", f"<style>{css}</style></head>", 1)
+                    path.write_text(self.inline_images(document), encoding="utf-8")
+
+                self.generate_page_files(root_page, target("html"), ".html", write_html)
+            elif fmt == "markdown":
+                self.generate_page_files(
+                    root_page,
+                    target("md"),
+                    ".md",
+                    lambda page, path: path.write_text(
+                        self.inline_images(f"# {page.title}\n\n{page.load_content()}"), encoding="utf-8"
+                    ),
+                )
+
+        for fmt, path in written.items():
+            print(f"{fmt} saved to: {path}", file=sys.stderr)
+        return written
 
     def _generate_single_page_html(self, page: PageContent) -> str:
         """Generate HTML for a single page without children."""
-        # Convert markdown to HTML
-        md_converter = markdown.Markdown(
-            extensions=["tables", "fenced_code", "toc", "nl2br"]
-        )
-        page_html = md_converter.convert(page.content)
+        # Convert markdown to HTML (no-op for the native renderer)
+        page_html = page.load_html()
+        if page_html is None:
+            page_html = self.content_to_html(page.load_content())
         
         # Build front matter if configured
         front_matter_parts = []
@@ -1206,6 +2621,26 @@ class NotionToPDF:
         return html
 
 
+def page_title(page: dict) -> str:
+    """Extract the title from a Notion page object."""
+    properties = page.get("properties", {})
+    
+    # Try different title property names
+    for prop_name in ["title", "Title", "Name", "name"]:
+        if prop_name in properties:
+            title_prop = properties[prop_name]
+            if title_prop.get("type") == "title":
+                title_array = title_prop.get("title", [])
+                if title_array:
+                    return "".join(t.get("plain_text", "") for t in title_array)
+    
+    # Fallback: try to get from page title directly
+    if "title" in page:
+        return "".join(t.get("plain_text", "") for t in page["title"])
+    
+    return "Untitled"
+
+
 def clean_page_id(page_id: str) -> str:
     """Clean and normalize a Notion page ID."""
     page_id = page_id.strip()
@@ -1238,6 +2673,180 @@ def clean_page_id(page_id: str) -> str:
     return page_id
 
 
+def load_batch_manifest(path: str) -> list[dict]:
+    """Load a batch manifest: a JSON list of jobs, or {"jobs": [...]}.
+
+    Each job needs "page_id" and "output"; any other key overrides the
+    matching export setting for that job (one of EXPORT_OPTIONS).
+    """
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    jobs = data.get("jobs", []) if isinstance(data, dict) else data
+    for i, job in enumerate(jobs):
+        if not isinstance(job, dict) or "page_id" not in job or "output" not in job:
+            raise ValueError(f"Batch job #{i} in {path} needs 'page_id' and 'output'")
+    return jobs
+
+
+class ExportServer:
+    """Local HTTP export service that keeps a warm converter between jobs.
+
+    WeasyPrint is imported and the stylesheet parsed once at startup; the
+    Notion client, rate limiter and image caches are shared by every job.
+
+    Endpoints:
+        POST /jobs          {"page_id", "output", "priority"?, ...options} -> 202
+        GET  /jobs          all jobs with state and progress
+        GET  /jobs/<id>     one job
+        GET  /health        liveness and queue depth
+    Lower priority numbers run first; options are limited to EXPORT_OPTIONS.
+    Only the last ``keep_jobs`` finished jobs are listed, and in-memory
+    images are dropped whenever no job is running.
+    """
+
+    def __init__(
+        self,
+        converter: NotionToPDF,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        workers: int = 1,
+        keep_jobs: int = 1000,
+    ):
+        self.converter = converter
+        self.jobs: dict[str, dict] = {}
+        self.keep_jobs = keep_jobs
+        self.running = 0
+        self.queue: queue.PriorityQueue = queue.PriorityQueue()
+        self.sequence = itertools.count()
+        self.job_ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.workers = [
+            threading.Thread(target=self._work, name=f"export-worker-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+
+    def warm_up(self) -> None:
+        """Pay WeasyPrint import and CSS parsing costs before the first job."""
+        self.converter._stylesheet()
+
+    def submit(self, request: dict) -> dict:
+        if not isinstance(request, dict) or "page_id" not in request or "output" not in request:
+            raise ValueError("Job needs 'page_id' and 'output'")
+        options = {k: v for k, v in request.items() if k not in ("page_id", "output", "priority")}
+        # derive() rejects anything outside EXPORT_OPTIONS.
+        converter = self.converter.derive(**options)
+        job = {
+            "id": str(next(self.job_ids)),
+            "page_id": clean_page_id(request["page_id"]),
+            "output": request["output"],
+            "priority": int(request.get("priority", 10)),
+            "state": "queued",
+            "submitted": time.time(),
+            "started": None,
+            "finished": None,
+            "result": None,
+            "error": None,
+            "progress": converter.progress,
+        }
+        with self.lock:
+            self.jobs[job["id"]] = job
+        self.queue.put((job["priority"], next(self.sequence), job["id"], converter))
+        return job
+
+    @staticmethod
+    def snapshot(job: dict) -> dict:
+        """Copy a job (and its live progress) for serializing; hold self.lock."""
+        return {**job, "progress": dict(job["progress"])}
+
+    def _work(self) -> None:
+        while True:
+            _, _, job_id, converter = self.queue.get()
+            with self.lock:
+                job = self.jobs[job_id]
+                self.running += 1
+            job["state"] = "running"
+            job["started"] = time.time()
+            try:
+                job["result"] = converter.generate_pdf(job["page_id"], job["output"])
+                job["state"] = "done"
+            except Exception as e:
+                self.converter.log(f"Export job {job_id} failed: {e}", "error")
+                job["error"] = str(e)
+                job["state"] = "failed"
+            finally:
+                job["finished"] = time.time()
+                converter.progress["stage"] = job["state"]
+                with self.lock:
+                    self.running -= 1
+                    if not self.running:
+                        # Images are per export; the daemon must not hold every job's.
+                        self.converter.clear_image_state()
+                    finished = [key for key, entry in self.jobs.items() if entry["finished"]]
+                    for key in finished[: max(0, len(finished) - self.keep_jobs)]:
+                        del self.jobs[key]
+                self.queue.task_done()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, status: int, payload) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self) -> None:
+                path = self.path.rstrip("/")
+                if path == "/health":
+                    self._send(200, {"status": "ok", "queued": server.queue.qsize()})
+                elif path == "/jobs":
+                    with server.lock:
+                        jobs = [server.snapshot(job) for job in server.jobs.values()]
+                    self._send(200, jobs)
+                elif path.startswith("/jobs/"):
+                    with server.lock:
+                        job = server.jobs.get(path.split("/")[-1])
+                        job = server.snapshot(job) if job else None
+                    if job:
+                        self._send(200, job)
+                    else:
+                        self._send(404, {"error": "unknown job"})
+                else:
+                    self._send(404, {"error": "not found"})
+
+            def do_POST(self) -> None:
+                if self.path.rstrip("/") != "/jobs":
+                    self._send(404, {"error": "not found"})
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    request = json.loads(self.rfile.read(length) or b"{}")
+                    job = server.submit(request)
+                except (ValueError, TypeError) as e:
+                    self._send(400, {"error": str(e)})
+                    return
+                self._send(202, job)
+
+            def log_message(self, format: str, *args) -> None:
+                server.converter.log(format % args, "debug")
+
+        return Handler
+
+    def serve_forever(self) -> None:
+        self.warm_up()
+        for worker in self.workers:
+            worker.start()
+        host, port = self.httpd.server_address[:2]
+        print(f"Export server listening on http://{host}:{port}", file=sys.stderr)
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.httpd.server_close()
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Generate a PDF book from a Notion page and its subpages.",
@@ -1256,13 +2865,40 @@ Examples:
     # Include subpages recursively
     %(prog)s abc123def456... --recursive
 
+    # Export many roots in one process (shared rate limit and caches)
+    %(prog)s --batch nightly.json --recursive
+
+    # Estimate cost of a large recursive export before running it
+    %(prog)s abc123def456... --recursive --plan
+
+    # Combined book, per-page PDFs and Markdown from a single fetch
+    %(prog)s abc123def456... --recursive --formats pdf,split-pdf,markdown
+
+    # Re-export whenever pages under the root are edited
+    %(prog)s abc123def456... --recursive --watch
+
+    # Keep a warm export server running for on-demand jobs
+    %(prog)s --serve 8765 --recursive
+
 Environment Variables:
     NOTION_API_KEY    Your Notion integration token (required)
         """,
     )
     parser.add_argument(
         "page_id",
-        help="Notion page ID or URL",
+        nargs="?",
+        help="Notion page ID or URL (omit when using --batch)",
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="MANIFEST",
+        help="JSON manifest of {page_id, output, ...} jobs to export in one process",
+    )
+    parser.add_argument(
+        "--batch-jobs",
+        type=int,
+        default=3,
+        help="Batch jobs to run concurrently against the shared rate limit (default: 3)",
     )
     parser.add_argument(
         "-o", "--output",
@@ -1342,8 +2978,101 @@ Environment Variables:
         default=4,
         help="Maximum parallel workers for fetching pages (default: 4, respects Notion's 3 req/s limit)",
     )
+    parser.add_argument(
+        "--convert-workers",
+        type=int,
+        default=1,
+        help="Processes for Markdown-to-HTML conversion, overlapped with fetching "
+        "(default: 1, convert inline; try the CPU count for large exports)",
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Tune Notion and image concurrency automatically (AIMD on 429s and latency); "
+        "--max-workers and --image-workers become upper bounds",
+    )
+    parser.add_argument(
+        "--renderer",
+        choices=RENDERERS,
+        default="markdown",
+        help="Content renderer: convert via Markdown, or render blocks straight to HTML (default: markdown)",
+    )
+    parser.add_argument(
+        "--discovery",
+        choices=["blocks", "search"],
+        default="blocks",
+        help="Find subpages by listing each page's blocks, or all at once via the search API "
+        "(far fewer calls for wide workspaces; sibling order follows creation time)",
+    )
+    parser.add_argument(
+        "--chapter-cache-dir",
+        help=(
+            "Cache rendered chapters here and merge them, so small edits re-render only changed chapters. "
+            "Chapters are keyed on their starting page number too, so an edit that changes an early "
+            "chapter's page count re-renders every chapter after it"
+        ),
+    )
+    parser.add_argument(
+        "--page-store",
+        nargs="?",
+        const="",
+        metavar="PATH",
+        help="Keep page contents in an SQLite file (temp file if no PATH) instead of memory",
+    )
+    parser.add_argument(
+        "--formats",
+        help=f"Comma-separated outputs to write from one fetch ({', '.join(EXPORT_FORMATS)})",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        help="Write Prometheus textfile-collector metrics here (during and at the end of the run)",
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=30.0,
+        help="Seconds between metrics file updates during a run (default: 30)",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Report tracemalloc peak/retained memory and top call sites per pipeline phase",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        help="With --profile-memory, also dump a cProfile .prof file per phase here",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Only walk the page hierarchy and print page/API call/image estimates",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="After exporting, poll for edits and re-export only what changed",
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=120.0,
+        help="Seconds between change polls in --watch mode (default: 120)",
+    )
+    parser.add_argument(
+        "--serve",
+        metavar="[HOST:]PORT",
+        help="Run a local HTTP export server instead of a single export",
+    )
+    parser.add_argument(
+        "--serve-workers",
+        type=int,
+        default=1,
+        help="Export jobs the server runs at once (default: 1)",
+    )
     
     args = parser.parse_args()
+    if not args.page_id and not args.batch and not args.serve:
+        parser.error("page_id is required unless --batch or --serve is given")
     
     # Load environment variables
     if args.env_file:
@@ -1362,7 +3091,7 @@ Environment Variables:
         sys.exit(1)
     
     # Clean the page ID
-    page_id = clean_page_id(args.page_id)
+    page_id = clean_page_id(args.page_id) if args.page_id else ""
     
     # Generate PDF
     converter = NotionToPDF(
@@ -1381,10 +3110,40 @@ Environment Variables:
         image_workers=args.image_workers,
         split_files=args.split_files,
         max_workers=args.max_workers,
+        adaptive=args.adaptive,
+        renderer=args.renderer,
+        convert_workers=args.convert_workers,
+        page_store=args.page_store,
+        chapter_cache_dir=args.chapter_cache_dir,
+        discovery=args.discovery,
+        profiler=PhaseProfiler(profile_dir=args.profile_dir) if args.profile_memory else None,
     )
+    metrics_stop = None
+    if args.metrics_file:
+        metrics_stop = converter.metrics.start_writer(args.metrics_file, args.metrics_interval)
+    success = False
     try:
-        converter.generate_pdf(page_id, args.output)
-        print(f"\n✅ Successfully generated: {args.output}")
+        if args.serve:
+            host, _, port = args.serve.rpartition(":")
+            ExportServer(converter, host or "127.0.0.1", int(port), args.serve_workers).serve_forever()
+            return
+        if args.batch:
+            results = converter.generate_batch(load_batch_manifest(args.batch), args.batch_jobs)
+            failed = [job for job, error in results if error]
+            print(f"\n✅ Batch finished: {len(results) - len(failed)} succeeded, {len(failed)} failed")
+            if failed:
+                sys.exit(1)
+        elif args.plan:
+            print(converter.format_plan(converter.plan(page_id)))
+        elif args.formats:
+            converter.export_formats(page_id, args.output, [f.strip() for f in args.formats.split(",") if f.strip()])
+            print(f"\n✅ Successfully generated: {args.output}")
+        elif args.watch:
+            converter.watch(page_id, args.output, args.watch_interval)
+        else:
+            converter.generate_pdf(page_id, args.output)
+            print(f"\n✅ Successfully generated: {args.output}")
+        success = True
     except APIResponseError as e:
         print(
             "\n❌ Notion API error:\n"
@@ -1405,6 +3164,14 @@ Environment Variables:
     except Exception as e:
         print(f"\n❌ Error: {e}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        if args.metrics_file:
+            metrics_stop.set()
+            converter.metrics.set("run_success", 1 if success else 0)
+            converter.metrics.write_textfile(args.metrics_file)
+        if converter.profiler:
+            print(converter.profiler.report(), file=sys.stderr)
+        converter.close()
 
 
 if __name__ == "__main__":
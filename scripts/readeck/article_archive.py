@@ -0,0 +1,110 @@
+import os
+import gzip
+import sqlite3
+import hashlib
+import threading
+import datetime
+
+# Export formats from /bookmarks/{id}/article.{format}, with their MIME types.
+FORMATS = {'epub': 'application/epub+zip', 'md': 'text/markdown'}
+
+
+class ArticleArchive:
+    """Content-addressed store of exported Readeck articles.
+
+    Objects live at objects/<sha256[:2]>/<sha256>.<format>[.gz], so identical
+    articles are stored once. Markdown is gzipped; EPUB is already a zip and
+    is kept as-is. index.sqlite3 maps bookmark ids to objects: a bookmark
+    with an index row is done, which makes an interrupted run resumable.
+    """
+
+    def __init__(self, root, fmt='md'):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown archive format {fmt!r}; expected one of {', '.join(FORMATS)}")
+        self.root = root
+        self.fmt = fmt
+        os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(os.path.join(root, 'index.sqlite3'), check_same_thread=False)
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS articles (
+                   bookmark_id TEXT,
+                   format TEXT,
+                   sha256 TEXT,
+                   size INTEGER,
+                   title TEXT,
+                   url TEXT,
+                   archived_at TEXT,
+                   PRIMARY KEY (bookmark_id, format)
+               )"""
+        )
+        self.db.commit()
+
+    def has(self, bookmark_id):
+        with self.lock:
+            row = self.db.execute(
+                'SELECT 1 FROM articles WHERE bookmark_id = ? AND format = ?', (bookmark_id, self.fmt)
+            ).fetchone()
+        return row is not None
+
+    def object_path(self, digest):
+        suffix = f".{self.fmt}.gz" if self.fmt == 'md' else f".{self.fmt}"
+        return os.path.join(self.root, 'objects', digest[:2], digest + suffix)
+
+    def store(self, bookmark, data):
+        """Write data (deduplicated by hash) and record it for the bookmark."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a per-thread temp file and rename, so a crash never leaves a partial object.
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, 'wb') as f:
+                f.write(gzip.compress(data) if self.fmt == 'md' else data)
+            os.replace(tmp, path)
+        with self.lock:
+            self.db.execute(
+                'INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (
+                    bookmark['id'],
+                    self.fmt,
+                    digest,
+                    len(data),
+                    bookmark.get('title'),
+                    bookmark.get('url'),
+                    datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+                ),
+            )
+            self.db.commit()
+        return digest
+
+    def archive(self, client, bookmark):
+        """Download and store one article unless already archived.
+
+        Returns True when the article is safely stored, False otherwise.
+        """
+        if self.has(bookmark['id']):
+            return True
+        try:
+            status, _, body = client.request(
+                'GET', f"/bookmarks/{bookmark['id']}/article.{self.fmt}", accept=FORMATS[self.fmt]
+            )
+        except RuntimeError as e:
+            print(f"  Error archiving bookmark {bookmark['id']}: {e}")
+            return False
+        if status != 200:
+            print(f"  Failed to archive {bookmark['id']}: HTTP {status}")
+            return False
+        self.store(bookmark, body)
+        return True
+
+    def close(self):
+        self.db.close()
+
+
+def archive_from_env():
+    """Return an ArticleArchive if ARCHIVE_DIR is set, else None."""
+    root = os.environ.get('ARCHIVE_DIR')
+    if not root:
+        return None
+    return ArticleArchive(os.path.expanduser(root), os.environ.get('ARCHIVE_FORMAT', 'md'))
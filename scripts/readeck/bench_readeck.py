@@ -0,0 +1,98 @@
+"""
+Load benchmark for the Readeck cleanup scripts against fake_readeck.py.
+
+Each mode runs the real script in a subprocess against a fresh fake server
+seeded with the same synthetic bookmarks, then reports wall time and how
+many bookmarks were deleted (or imported).
+
+Usage:
+    python bench_readeck.py [--bookmarks 10000] [--latency 0.005] [--error-rate 0.01] [mode ...]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+
+from fake_readeck import serve
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# mode -> (script arguments, extra environment, description)
+MODES = {
+    'serial': (['delete_old_archived.py'], {'DELETE_WORKERS': '1'}, "one delete at a time"),
+    'concurrent': (['delete_old_archived.py'], {}, "pooled keep-alive deletes"),
+    'mirror': (['delete_old_archived.py'], {'READECK_DB': '{tmp}/mirror.sqlite3'}, "candidates from the SQLite mirror"),
+    'archive': (['delete_old_archived.py'], {'ARCHIVE_DIR': '{tmp}/archive'}, "archive each article, then delete"),
+    'retention': (
+        ['retention.py'],
+        {'READECK_DB': '{tmp}/mirror.sqlite3', 'READECK_RULES': os.path.join(HERE, 'retention-rules.example.json')},
+        "example retention rules",
+    ),
+    'import': (
+        ['import_bookmarks.py', '{tmp}/links.txt'],
+        {'READECK_DB': '{tmp}/mirror.sqlite3', 'IMPORT_RATE': '{rate}'},
+        "batched import, half the links already saved",
+    ),
+}
+
+
+def run_mode(name, args):
+    command, extra, _ = MODES[name]
+    server, store = serve(args.bookmarks, latency=args.latency, error_rate=args.error_rate)
+    before = len(store.bookmarks)
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            'READECK_URL': f"http://127.0.0.1:{server.server_port}",
+            'READECK_API_KEY': 'fake',
+            'DELETE_WORKERS': str(args.workers),
+            'DELETE_RATE': str(args.rate),
+            'SYNC_RATE': str(args.rate),
+        }
+        env.pop('READECK_DB', None)
+        env.update({key: value.format(tmp=tmp, rate=args.rate) for key, value in extra.items()})
+        with open(os.path.join(tmp, 'links.txt'), 'w') as f:
+            # fake_readeck already holds example.com/0 .. /(n/2 - 1)
+            f.writelines(f"https://example.com/{n}\n" for n in range(args.bookmarks))
+        started = time.monotonic()
+        result = subprocess.run(
+            [sys.executable, *(arg.format(tmp=tmp) for arg in command)],
+            env=env, cwd=HERE, capture_output=True, text=True,
+        )
+        elapsed = time.monotonic() - started
+    server.shutdown()
+    server.server_close()
+    if result.returncode != 0:
+        print(result.stdout[-2000:] + result.stderr[-2000:])
+    return elapsed, abs(before - len(store.bookmarks)), result.returncode
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Readeck cleanup modes against a fake server.")
+    parser.add_argument('modes', nargs='*', help=f"Modes to run (default: all): {', '.join(MODES)}")
+    parser.add_argument('--bookmarks', type=int, default=10000, help="Synthetic bookmarks (default: 10000)")
+    parser.add_argument('--latency', type=float, default=0.005, help="Seconds per request (default: 0.005)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of 429/503 responses (default: 0)")
+    parser.add_argument('--workers', type=int, default=8, help="DELETE_WORKERS for concurrent modes (default: 8)")
+    parser.add_argument('--rate', type=float, default=0, help="Request rate cap, 0 for none (default: 0)")
+    args = parser.parse_args()
+
+    unknown = set(args.modes) - set(MODES)
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(sorted(unknown))}")
+
+    print(f"{args.bookmarks} bookmarks, {args.latency * 1000:g} ms latency, {args.error_rate:.0%} errors")
+    failed = False
+    for name in args.modes or MODES:
+        elapsed, changed, code = run_mode(name, args)
+        failed |= code != 0
+        status = "" if code == 0 else f"  (exit {code})"
+        print(f"{name:>12}: {elapsed:8.2f}s  {changed:7d} changed  {changed / elapsed:8.1f}/s  ({MODES[name][2]}){status}")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
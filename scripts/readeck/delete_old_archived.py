@@ -1,19 +1,131 @@
 import os
 import sys
 import json
+import time
 import datetime
-import urllib.request
-import urllib.parse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from readeck_api import client_from_env, fetch_by_ids, get_json
+from sync_bookmarks import open_db, sync
+from article_archive import archive_from_env
+
+
+def iter_bookmarks(client, params, batch_size=100):
+    """Yield bookmarks matching params without offset paging.
+
+    The candidate ids are snapshotted once from /bookmarks/sync, then
+    filtered server-side in id batches. Deleting matches while iterating
+    cannot shift later batches the way it shifts offset/limit windows.
+    """
+    ids = [entry['id'] for entry in get_json(client, '/bookmarks/sync') if entry.get('type') != 'delete']
+    print(f"Scanning {len(ids)} bookmarks...")
+    yield from fetch_by_ids(client, ids, params, batch_size)
+
+
+def iter_mirrored_bookmarks(client, range_end):
+    """Refresh the local mirror (see sync_bookmarks.py) and select matches from it."""
+    conn = open_db()
+    updated, deleted = sync(client, conn)
+    print(f"Mirror synced: {updated} updated, {deleted} deleted.")
+    rows = conn.execute(
+        "SELECT raw FROM bookmarks WHERE is_archived = 1 AND type = 'article' AND created < ?",
+        (range_end,),
+    ).fetchall()
+    conn.close()
+    for row in rows:
+        yield json.loads(row['raw'])
+
+
+def delete_bookmark(client, bookmark, archive=None, archive_only=False):
+    """Delete one bookmark and return 'deleted', 'archived', 'skipped' or 'failed'.
+
+    With an archive, the article is exported first and the bookmark is only
+    deleted once its copy is stored.
+    """
+    bookmark_id = bookmark['id']
+    if archive is not None:
+        if not archive.archive(client, bookmark):
+            return 'failed'
+        if archive_only:
+            return 'archived'
+    try:
+        status, _, _ = client.request('DELETE', f"/bookmarks/{bookmark_id}")
+    except RuntimeError as e:
+        print(f"  Error deleting bookmark {bookmark_id}: {e}")
+        return 'failed'
+    if status == 204:
+        return 'deleted'
+    if status == 404:
+        # Already gone, e.g. removed by an earlier interrupted run
+        return 'skipped'
+    print(f"  Failed to delete {bookmark_id}: HTTP {status}")
+    return 'failed'
+
+
+def delete_bookmarks(client, bookmarks, workers, dry_run=False, archive=None, archive_only=False):
+    """Delete bookmarks from an iterable on a pool of workers.
+
+    Listing and deleting overlap: the caller's iterable keeps producing
+    while the pool deletes, with at most 2 * workers bookmarks queued at
+    once. Returns (found, counts, listing_failed, elapsed).
+    """
+    counts = {'deleted': 0, 'archived': 0, 'failed': 0, 'skipped': 0}
+    counts_lock = threading.Lock()
+    slots = threading.BoundedSemaphore(2 * workers)
+    found = 0
+    started = time.monotonic()
+
+    def work(bookmark):
+        # Exceptions raised here would be swallowed by the done-callback; count them as failures.
+        try:
+            return delete_bookmark(client, bookmark, archive, archive_only)
+        except Exception as e:
+            print(f"  Error processing bookmark {bookmark['id']}: {e}")
+            return 'failed'
+
+    def finished(future):
+        slots.release()
+        with counts_lock:
+            counts[future.result()] += 1
+            done = sum(counts.values())
+        if done % 100 == 0:
+            print(f"Processed {done} bookmarks...")
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for bookmark in bookmarks:
+                found += 1
+                if dry_run:
+                    title = bookmark.get('title', 'No Title')
+                    created = bookmark.get('created', 'Unknown date')
+                    print(f"[DRY RUN] Would delete: {title} (ID: {bookmark['id']}, Created: {created})")
+                    counts['skipped'] += 1
+                    continue
+                slots.acquire()
+                pool.submit(work, bookmark).add_done_callback(finished)
+    except RuntimeError as e:
+        # Bookmarks already queued are still deleted before we get here.
+        print(e)
+        listing_failed = True
+    else:
+        listing_failed = False
+    return found, counts, listing_failed, time.monotonic() - started
+
+
+def print_summary(found, counts, elapsed, dry_run=False):
+    skipped = "dry run" if dry_run else "already gone"
+    archived = f"{counts['archived']} archived only, " if counts['archived'] else ""
+    print(
+        f"\nSummary: {found} matched, {counts['deleted']} deleted, {archived}{counts['failed']} failed, "
+        f"{counts['skipped']} skipped ({skipped}) in {elapsed:.1f}s."
+    )
+
 
 def main():
     # Configuration from environment variables
-    readeck_url = os.environ.get('READECK_URL', 'https://read.cabeda.dev')
-    readeck_token = os.environ.get('READECK_API_KEY')
-
-    if not readeck_token:
-        print("Error: READECK_API_KEY environment variable is not set.")
-        print("Please set it with: export READECK_API_KEY='your_token_here'")
-        sys.exit(1)
+    workers = int(os.environ.get('DELETE_WORKERS', '8'))
+    rate = float(os.environ.get('DELETE_RATE', '10'))
 
     # Calculate date 60 days ago
     sixty_days_ago = datetime.datetime.now() - datetime.timedelta(days=60)
@@ -22,86 +134,45 @@ def main():
 
     print(f"Targeting archived bookmarks created before: {range_end}")
 
-    base_api_url = f"{readeck_url.rstrip('/')}/api"
-    
+    client = client_from_env(rate=rate)
+
     # Fetch archived bookmarks
     # We use range_end to filter by creation date and type=article
     params = {
         'is_archived': 'true',
         'range_end': range_end,
         'type': 'article',
-        'limit': 100
     }
-    
-    bookmarks_to_delete = []
-    offset = 0
-    
-    print("Fetching bookmarks...")
-    while True:
-        query_params = {**params, 'offset': offset}
-        query_string = urllib.parse.urlencode(query_params)
-        url = f"{base_api_url}/bookmarks?{query_string}"
-        
-        req = urllib.request.Request(url)
-        req.add_header('Authorization', f'Bearer {readeck_token}')
-        req.add_header('Accept', 'application/json')
-        
-        try:
-            with urllib.request.urlopen(req) as response:
-                data = json.loads(response.read().decode())
-                if not data:
-                    break
-                bookmarks_to_delete.extend(data)
-                
-                # Check if we should continue fetching
-                total_count = int(response.headers.get('Total-Count', 0))
-                print(f"Fetched {len(bookmarks_to_delete)} / {total_count} bookmarks...")
-                
-                if len(data) < params['limit'] or len(bookmarks_to_delete) >= total_count:
-                    break
-                offset += params['limit']
-        except Exception as e:
-            print(f"Error fetching bookmarks: {e}")
-            break
 
-    if not bookmarks_to_delete:
-        print("No archived bookmarks found older than 60 days.")
-        return
-
-    print(f"\nFound {len(bookmarks_to_delete)} bookmarks to delete.")
-    
-    # Confirm with user if running interactively? 
-    # For a script like this, maybe just a dry run option or just go for it.
-    # I'll add a simple check for DRY_RUN env var.
+    # Set DRY_RUN=true to list what would be deleted without deleting anything.
     dry_run = os.environ.get('DRY_RUN', 'false').lower() == 'true'
+    # ARCHIVE_DIR exports each article before deleting it; ARCHIVE_ONLY=true skips the delete.
+    archive = archive_from_env()
+    archive_only = os.environ.get('ARCHIVE_ONLY', 'false').lower() == 'true'
     if dry_run:
         print("DRY_RUN is enabled. No bookmarks will be deleted.")
+    elif archive_only and archive is not None:
+        print(f"Archiving to {archive.root} with {workers} workers at up to {rate:g} requests/s...")
+    else:
+        print(f"Deleting with {workers} workers at up to {rate:g} requests/s...")
 
-    for bookmark in bookmarks_to_delete:
-        bookmark_id = bookmark['id']
-        title = bookmark.get('title', 'No Title')
-        created = bookmark.get('created', 'Unknown date')
-        
-        if dry_run:
-            print(f"[DRY RUN] Would delete: {title} (ID: {bookmark_id}, Created: {created})")
-            continue
-            
-        print(f"Deleting: {title} (ID: {bookmark_id}, Created: {created})")
-        
-        delete_url = f"{base_api_url}/bookmarks/{bookmark_id}"
-        delete_req = urllib.request.Request(delete_url, method='DELETE')
-        delete_req.add_header('Authorization', f'Bearer {readeck_token}')
-        
-        try:
-            with urllib.request.urlopen(delete_req) as response:
-                if response.status == 204:
-                    print(f"  Successfully deleted.")
-                else:
-                    print(f"  Failed to delete: HTTP {response.status}")
-        except Exception as e:
-            print(f"  Error deleting bookmark {bookmark_id}: {e}")
+    # With READECK_DB set, candidates come from the local mirror instead of the API.
+    if os.environ.get('READECK_DB'):
+        bookmarks = iter_mirrored_bookmarks(client, range_end)
+    else:
+        bookmarks = iter_bookmarks(client, params)
+    found, counts, listing_failed, elapsed = delete_bookmarks(
+        client, bookmarks, workers, dry_run, archive, archive_only
+    )
+    if archive is not None:
+        archive.close()
 
-    print("\nDone.")
+    if not found and not listing_failed:
+        print("No archived bookmarks found older than 60 days.")
+        return
+    print_summary(found, counts, elapsed, dry_run)
+    if counts['failed'] or listing_failed:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,309 @@
+"""
+Local stand-in for the Readeck API, for benchmarking the scripts in this
+directory without touching a real instance.
+
+Serves the subset of openapi-spec.json the scripts use, checked against
+the spec at startup: /bookmarks (with filters, offset/limit and
+Total-Count), DELETE /bookmarks/{id}, /bookmarks/sync,
+/bookmarks/annotations, /bookmarks/{id}/article.{format} and
+/bookmarks/import/{text,csv}. Latency and error injection are configurable.
+
+Usage:
+    python fake_readeck.py [--bookmarks 10000] [--port 8000] [--latency 0.005] [--error-rate 0.01]
+"""
+
+import io
+import os
+import sys
+import csv
+import json
+import time
+import random
+import bisect
+import argparse
+import datetime
+import threading
+import urllib.parse
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SPEC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'openapi-spec.json')
+
+# Spec paths this server implements, by method.
+ROUTES = {
+    ('GET', '/bookmarks'),
+    ('GET', '/bookmarks/sync'),
+    ('GET', '/bookmarks/annotations'),
+    ('GET', '/bookmarks/{id}/article.{format}'),
+    ('DELETE', '/bookmarks/{id}'),
+    ('POST', '/bookmarks/import/text'),
+    ('POST', '/bookmarks/import/csv'),
+}
+
+
+def validate_against_spec(sample_bookmark, spec_path=SPEC_PATH):
+    """Fail fast if the fake drifts from the bundled OpenAPI spec."""
+    with open(spec_path) as f:
+        spec = json.load(f)
+    for method, path in ROUTES:
+        if method.lower() not in spec['paths'].get(path, {}):
+            raise ValueError(f"{method} {path} is not in {spec_path}")
+    allowed = set(spec['components']['schemas']['bookmarkSummary']['properties'])
+    extra = set(sample_bookmark) - allowed
+    if extra:
+        raise ValueError(f"Fake bookmark fields not in bookmarkSummary: {', '.join(sorted(extra))}")
+
+
+class FakeReadeck:
+    """In-memory bookmark store with a change log for /bookmarks/sync."""
+
+    def __init__(self, count, seed=0, now=None):
+        rng = random.Random(seed)
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        self.lock = threading.Lock()
+        self.bookmarks = {}
+        self.annotations = []
+        self.log_times = []
+        self.log = []
+        self.generation = 0
+        self.list_cache = {}
+        self.url_index = None
+        self.clock = now
+        for n in range(count):
+            bookmark_id = f"bm{n:07d}"
+            created = now - datetime.timedelta(days=rng.uniform(0, 365))
+            self.bookmarks[bookmark_id] = {
+                'id': bookmark_id,
+                'href': f"/api/bookmarks/{bookmark_id}",
+                'created': created.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'updated': created.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'url': f"https://example.com/{n % (count // 2 or 1)}",
+                'title': f"Synthetic bookmark {n}",
+                'site': 'example.com',
+                'type': rng.choices(['article', 'video', 'photo'], [8, 1, 1])[0],
+                'is_marked': rng.random() < 0.05,
+                'is_archived': rng.random() < 0.5,
+                'read_progress': rng.choice([0, 50, 100]),
+                'has_article': True,
+                'labels': rng.sample(['news', 'tech', 'keep', 'later'], rng.randint(0, 2)),
+                'word_count': rng.randint(200, 5000),
+            }
+            if rng.random() < 0.02:
+                self.annotations.append({'id': f"an{n:07d}", 'bookmark_id': bookmark_id, 'created': self.bookmarks[bookmark_id]['created']})
+            self._record(bookmark_id, 'update')
+
+    def _record(self, bookmark_id, kind):
+        # Strictly increasing change times, so `since` lookups are a bisect.
+        self.clock += datetime.timedelta(microseconds=1)
+        self.log_times.append(self.clock.strftime('%Y-%m-%dT%H:%M:%S.%fZ'))
+        self.log.append((bookmark_id, kind))
+
+    def delete(self, bookmark_id):
+        with self.lock:
+            if self.bookmarks.pop(bookmark_id, None) is None:
+                return False
+            self._record(bookmark_id, 'delete')
+            self.generation += 1
+            return True
+
+    def add(self, url, title=None):
+        """Create a bookmark like an import would; duplicates are ignored."""
+        with self.lock:
+            if url in self.urls():
+                return False
+            bookmark_id = f"im{len(self.log):07d}"
+            stamp = self.clock.strftime('%Y-%m-%dT%H:%M:%SZ')
+            self.bookmarks[bookmark_id] = {
+                'id': bookmark_id, 'href': f"/api/bookmarks/{bookmark_id}", 'created': stamp,
+                'updated': stamp, 'url': url, 'title': title or url, 'site': urllib.parse.urlsplit(url).netloc,
+                'type': 'article', 'is_marked': False, 'is_archived': False, 'read_progress': 0,
+                'has_article': False, 'labels': [], 'word_count': 0,
+            }
+            self.url_index.add(url)
+            self._record(bookmark_id, 'update')
+            self.generation += 1
+            return True
+
+    def urls(self):
+        if self.url_index is None:
+            self.url_index = {b['url'] for b in self.bookmarks.values()}
+        return self.url_index
+
+    def sync(self, since=None):
+        with self.lock:
+            if since is None:
+                stamp = self.log_times[-1] if self.log_times else None
+                return [{'id': i, 'time': stamp, 'type': 'update'} for i in self.bookmarks]
+            start = bisect.bisect_left(self.log_times, since)
+            latest = {}
+            for stamp, (bookmark_id, kind) in zip(self.log_times[start:], self.log[start:]):
+                latest[bookmark_id] = {'id': bookmark_id, 'time': stamp, 'type': kind}
+            return list(latest.values())
+
+    def query(self, params):
+        """Filter like GET /bookmarks; returns (page, total)."""
+        offset = int(params.pop('offset', ['0'])[0])
+        limit = int(params.pop('limit', ['20'])[0])
+        with self.lock:
+            if 'id' in params:
+                candidates = [self.bookmarks[i] for i in params['id'] if i in self.bookmarks]
+                matches = self._filter(candidates, params)
+            else:
+                # Offset paging re-runs the same query; cache it until the next delete.
+                key = (self.generation, json.dumps(params, sort_keys=True))
+                if key not in self.list_cache:
+                    self.list_cache = {key: self._filter(self.bookmarks.values(), params)}
+                matches = self.list_cache[key]
+        return matches[offset:offset + limit], len(matches)
+
+    @staticmethod
+    def _filter(bookmarks, params):
+        def flag(name):
+            return params[name][0] == 'true' if name in params else None
+
+        archived, marked = flag('is_archived'), flag('is_marked')
+        types = set(params.get('type', []))
+        range_end = params.get('range_end', [None])[0]
+        return [
+            b for b in bookmarks
+            if (archived is None or b['is_archived'] == archived)
+            and (marked is None or b['is_marked'] == marked)
+            and (not types or b['type'] in types)
+            and (range_end is None or b['created'] < range_end)
+        ]
+
+
+def make_handler(store, latency=0.0, error_rate=0.0):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def send(self, status, data=None, headers=None, content_type='application/json'):
+            body = b'' if data is None else data if isinstance(data, bytes) else json.dumps(data).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def discard_body(self):
+            # An unread request body would be parsed as the next request on this keep-alive socket.
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+        def prelude(self):
+            """Apply latency and injected errors; returns parsed (path, params) or None."""
+            if latency:
+                time.sleep(latency)
+            if error_rate and random.random() < error_rate:
+                self.discard_body()
+                if random.random() < 0.5:
+                    self.send(429, {'status': 429, 'message': 'Too Many Requests'}, {'Retry-After': '0'})
+                else:
+                    self.send(503, {'status': 503, 'message': 'Service Unavailable'})
+                return None
+            if not self.headers.get('Authorization', '').startswith('Bearer '):
+                self.discard_body()
+                self.send(401, {'status': 401, 'message': 'Unauthorized'})
+                return None
+            url = urllib.parse.urlsplit(self.path)
+            path = url.path[len('/api'):] if url.path.startswith('/api/') else url.path
+            return path, urllib.parse.parse_qs(url.query)
+
+        def do_GET(self):
+            parsed = self.prelude()
+            if parsed is None:
+                return
+            path, params = parsed
+            if path == '/bookmarks':
+                page, total = store.query(params)
+                self.send(200, page, {'Total-Count': str(total)})
+            elif path == '/bookmarks/sync':
+                self.send(200, store.sync(params.get('since', [None])[0]))
+            elif path == '/bookmarks/annotations':
+                offset = int(params.get('offset', ['0'])[0])
+                limit = int(params.get('limit', ['20'])[0])
+                self.send(200, store.annotations[offset:offset + limit], {'Total-Count': str(len(store.annotations))})
+            elif path.startswith('/bookmarks/') and '/article.' in path:
+                bookmark_id, fmt = path.split('/')[2], path.rsplit('.', 1)[1]
+                if bookmark_id not in store.bookmarks or fmt not in ('md', 'epub'):
+                    self.send(404, {'status': 404, 'message': 'Not Found'})
+                    return
+                title = store.bookmarks[bookmark_id]['title']
+                self.send(200, f"# {title}\n\n{'Lorem ipsum dolor sit amet. ' * 200}\n".encode(), content_type='text/markdown')
+            else:
+                self.send(404, {'status': 404, 'message': 'Not Found'})
+
+        def do_POST(self):
+            parsed = self.prelude()
+            if parsed is None:
+                return
+            path, _ = parsed
+            if path not in ('/bookmarks/import/text', '/bookmarks/import/csv'):
+                self.discard_body()
+                self.send(404, {'status': 404, 'message': 'Not Found'})
+                return
+            raw = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            form = BytesParser(policy=HTTP).parsebytes(
+                f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + raw
+            )
+            data = next(
+                (part.get_payload(decode=True) for part in form.iter_parts() if part.get_param('name', header='content-disposition') == 'data'),
+                b'',
+            ).decode()
+            if path.endswith('/csv'):
+                rows = [(row.get('url'), row.get('title')) for row in csv.DictReader(io.StringIO(data))]
+            else:
+                rows = [(line.strip(), None) for line in data.splitlines()]
+            for url, title in rows:
+                if url:
+                    store.add(url, title)
+            self.send(202, {'status': 202, 'message': 'Import started'}, {'Location': '/api/bookmarks/import'})
+
+        def do_DELETE(self):
+            parsed = self.prelude()
+            if parsed is None:
+                return
+            path, _ = parsed
+            if path.startswith('/bookmarks/') and store.delete(path.split('/')[2]):
+                self.send(204)
+            else:
+                self.send(404, {'status': 404, 'message': 'Not Found'})
+
+    return Handler
+
+
+def serve(count, port=0, latency=0.0, error_rate=0.0, seed=0):
+    """Start a fake server in a background thread; returns (server, store)."""
+    store = FakeReadeck(count, seed=seed)
+    validate_against_spec(next(iter(store.bookmarks.values()), {}))
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(store, latency, error_rate))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fake Readeck API for local testing.")
+    parser.add_argument('--bookmarks', type=int, default=10000, help="Synthetic bookmarks (default: 10000)")
+    parser.add_argument('--port', type=int, default=8000, help="Port to listen on (default: 8000)")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered 429/503")
+    args = parser.parse_args()
+
+    server, store = serve(args.bookmarks, args.port, args.latency, args.error_rate)
+    print(f"Fake Readeck with {len(store.bookmarks)} bookmarks at http://127.0.0.1:{server.server_port}")
+    print(f"Use: READECK_URL=http://127.0.0.1:{server.server_port} READECK_API_KEY=fake")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        sys.exit(0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import os
+import io
+import sys
+import csv
+import time
+import datetime
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+from readeck_api import client_from_env, encode_multipart
+from sync_bookmarks import open_db, sync
+
+# Columns /bookmarks/import/csv understands besides url.
+CSV_COLUMNS = ['title', 'state', 'created', 'labels']
+
+
+def normalize_url(url):
+    """Canonical form used for duplicate detection (not what gets imported)."""
+    parts = urllib.parse.urlsplit(url.strip())
+    path = parts.path.rstrip('/') or '/'
+    return urllib.parse.urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ''))
+
+
+def read_links(paths):
+    """Yield link rows ({'url': ..., optional CSV columns}) from .txt/.csv files or '-' for stdin."""
+    for path in paths:
+        handle = sys.stdin if path == '-' else open(path, newline='')
+        with handle:
+            if path.endswith('.csv'):
+                for row in csv.DictReader(handle):
+                    row = {k.lower(): v for k, v in row.items() if k}
+                    if row.get('url'):
+                        yield row
+            else:
+                for line in handle:
+                    line = line.strip()
+                    if line and not line.startswith('#'):
+                        yield {'url': line}
+
+
+def imported_table(conn):
+    """URLs submitted by earlier imports, in case the mirror has not caught up yet."""
+    conn.execute('CREATE TABLE IF NOT EXISTS imported_urls (url TEXT PRIMARY KEY, imported_at TEXT)')
+    return {row['url'] for row in conn.execute('SELECT url FROM imported_urls')}
+
+
+def batch_file(rows):
+    """Render a batch as (endpoint, filename, bytes): plain URLs as text, anything richer as CSV."""
+    if not any(row.get(column) for row in rows for column in CSV_COLUMNS):
+        return '/bookmarks/import/text', 'links.txt', ''.join(f"{row['url']}\n" for row in rows).encode()
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=['url', *CSV_COLUMNS], extrasaction='ignore')
+    writer.writeheader()
+    writer.writerows(rows)
+    return '/bookmarks/import/csv', 'links.csv', out.getvalue().encode()
+
+
+def import_batch(client, rows, fields):
+    """POST one batch; returns True once Readeck has accepted it (HTTP 202)."""
+    endpoint, filename, data = batch_file(rows)
+    body, content_type = encode_multipart(fields, {'data': (filename, data)})
+    try:
+        # Retried POSTs are safe: ignore_duplicates makes a re-sent batch a no-op.
+        status, _, _ = client.request('POST', endpoint, body=body, content_type=content_type)
+    except RuntimeError as e:
+        print(f"  Error importing batch of {len(rows)}: {e}")
+        return False
+    if status != 202:
+        print(f"  Failed to import batch of {len(rows)}: HTTP {status}")
+        return False
+    return True
+
+
+def main():
+    workers = int(os.environ.get('IMPORT_WORKERS', '4'))
+    rate = float(os.environ.get('IMPORT_RATE', '2'))
+    batch_size = int(os.environ.get('IMPORT_BATCH_SIZE', '500'))
+    dry_run = os.environ.get('DRY_RUN', 'false').lower() == 'true'
+    paths = sys.argv[1:]
+    if not paths:
+        print("Usage: import_bookmarks.py LINKS.txt|LINKS.csv|- [...]")
+        sys.exit(1)
+
+    # baseImport options from the API spec
+    fields = {'ignore_duplicates': 'true'}
+    if os.environ.get('IMPORT_LABEL'):
+        fields['label'] = os.environ['IMPORT_LABEL']
+    if os.environ.get('IMPORT_ARCHIVE', 'false').lower() == 'true':
+        fields['archive'] = 'true'
+
+    client = client_from_env(rate=rate)
+    conn = open_db()
+    updated, deleted = sync(client, conn)
+    print(f"Mirror synced: {updated} updated, {deleted} deleted.")
+
+    known = {normalize_url(row['url']) for row in conn.execute('SELECT url FROM bookmarks') if row['url']}
+    known |= imported_table(conn)
+    links, duplicates = [], 0
+    for row in read_links(paths):
+        key = normalize_url(row['url'])
+        if key in known:
+            duplicates += 1
+            continue
+        known.add(key)
+        links.append(row)
+    print(f"{len(links)} new links, {duplicates} already in Readeck or repeated.")
+    if not links or dry_run:
+        if dry_run:
+            print("DRY_RUN is enabled. Nothing will be imported.")
+        return
+
+    batches = [links[i:i + batch_size] for i in range(0, len(links), batch_size)]
+    print(f"Importing in {len(batches)} batches of up to {batch_size} with {workers} workers...")
+    started = time.monotonic()
+    imported = failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for rows, ok in zip(batches, pool.map(lambda rows: import_batch(client, rows, fields), batches)):
+            if not ok:
+                failed += len(rows)
+                continue
+            imported += len(rows)
+            now = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')
+            with conn:
+                conn.executemany(
+                    'INSERT OR IGNORE INTO imported_urls (url, imported_at) VALUES (?, ?)',
+                    [(normalize_url(row['url']), now) for row in rows],
+                )
+    conn.close()
+
+    print(
+        f"\nSummary: {imported} submitted, {failed} failed, {duplicates} skipped as duplicates "
+        f"in {time.monotonic() - started:.1f}s. Readeck fetches the pages in the background."
+    )
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Shared Readeck API helpers for the scripts in this directory."""
+
+import os
+import sys
+import json
+import time
+import uuid
+import threading
+import http.client
+import urllib.parse
+
+
+class ReadeckClient:
+    """Small Readeck API client with keep-alive connections, rate limiting and retries.
+
+    Each worker thread keeps its own persistent HTTP(S) connection, so
+    concurrent requests reuse TLS sessions instead of reconnecting per call.
+    """
+
+    def __init__(self, base_url, token, rate=10.0, max_attempts=5, timeout=30):
+        parsed = urllib.parse.urlsplit(base_url)
+        self.scheme = parsed.scheme
+        self.host = parsed.netloc
+        self.base_path = parsed.path.rstrip('/')
+        self.token = token
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.local = threading.local()
+        self.rate_lock = threading.Lock()
+        self.next_slot = 0.0
+
+    def _connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+            conn = cls(self.host, timeout=self.timeout)
+            self.local.conn = conn
+        return conn
+
+    def _reset_connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is not None:
+            conn.close()
+        self.local.conn = None
+
+    def _throttle(self):
+        """Space requests at least 1/rate seconds apart across all threads."""
+        if not self.interval:
+            return
+        with self.rate_lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def request(self, method, path, params=None, accept='application/json', body=None, content_type=None):
+        """Send a request and return (status, headers, body).
+
+        429 and 5xx responses and dropped connections are retried with
+        exponential backoff, honouring Retry-After when the server sends it.
+        """
+        url = f"{self.base_path}{path}"
+        if params:
+            url += '?' + urllib.parse.urlencode(params, doseq=True)
+        headers = {
+            'Authorization': f'Bearer {self.token}',
+            'Accept': accept,
+        }
+        if content_type:
+            headers['Content-Type'] = content_type
+        for attempt in range(1, self.max_attempts + 1):
+            self._throttle()
+            retry_after = None
+            try:
+                conn = self._connection()
+                conn.request(method, url, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+                if response.status != 429 and response.status < 500:
+                    return response.status, response.headers, data
+                error = f"HTTP {response.status}"
+                retry_after = response.headers.get('Retry-After')
+            except (OSError, http.client.HTTPException) as e:
+                self._reset_connection()
+                error = str(e) or e.__class__.__name__
+            if attempt == self.max_attempts:
+                raise RuntimeError(f"{method} {path} failed after {attempt} attempts: {error}")
+            delay = float(retry_after) if retry_after and retry_after.isdigit() else 2 ** (attempt - 1)
+            time.sleep(delay)
+
+
+def encode_multipart(fields, files):
+    """Encode form fields and {name: (filename, bytes)} files as multipart/form-data.
+
+    Returns (body, content_type) for ReadeckClient.request.
+    """
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        )
+    for name, (filename, data) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n'.encode() + data + b'\r\n'
+        )
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+def client_from_env(rate=10.0):
+    """Build a ReadeckClient from READECK_URL and READECK_API_KEY, or exit."""
+    readeck_url = os.environ.get('READECK_URL', 'https://read.cabeda.dev')
+    readeck_token = os.environ.get('READECK_API_KEY')
+    if not readeck_token:
+        print("Error: READECK_API_KEY environment variable is not set.")
+        print("Please set it with: export READECK_API_KEY='your_token_here'")
+        sys.exit(1)
+    return ReadeckClient(f"{readeck_url.rstrip('/')}/api", readeck_token, rate=rate)
+
+
+def get_json(client, path, params=None):
+    """GET a JSON endpoint, raising RuntimeError on a non-200 response."""
+    status, _, body = client.request('GET', path, params)
+    if status != 200:
+        raise RuntimeError(f"GET {path} failed: HTTP {status}")
+    return json.loads(body.decode())
+
+
+def fetch_by_ids(client, ids, params=None, batch_size=100):
+    """Yield bookmark summaries for ids via /bookmarks, batch_size ids per call."""
+    for start in range(0, len(ids), batch_size):
+        batch = ids[start:start + batch_size]
+        yield from get_json(client, '/bookmarks', {**(params or {}), 'id': batch, 'limit': len(batch)})
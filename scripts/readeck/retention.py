@@ -0,0 +1,144 @@
+import os
+import sys
+import json
+import datetime
+
+from readeck_api import client_from_env
+from sync_bookmarks import open_db, sync
+from delete_old_archived import delete_bookmarks, print_summary
+from article_archive import archive_from_env
+
+# Rules file format (JSON), see retention-rules.example.json:
+#
+# {
+#   "keep": {"marked": true, "annotated": true, "labels": ["keep"]},
+#   "rules": [
+#     {"name": "old articles", "type": "article", "archived": true, "older_than_days": 60},
+#     {"name": "news", "label": "news", "older_than_days": 14},
+#     {"name": "videos", "type": "video", "keep_newest": 50}
+#   ]
+# }
+#
+# A bookmark is deleted when it matches any rule and no "keep" condition.
+# Rule fields are ANDed together; keep_newest spares the newest N matches.
+RULE_FIELDS = {'name', 'type', 'archived', 'marked', 'label', 'site', 'older_than_days', 'keep_newest'}
+
+
+def rule_sql(rule, now):
+    """Translate one rule into (SELECT id ... , params) over the mirror."""
+    unknown = set(rule) - RULE_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown field(s) in rule {rule.get('name', '?')!r}: {', '.join(sorted(unknown))}")
+    where, params = [], []
+    if 'type' in rule:
+        types = rule['type'] if isinstance(rule['type'], list) else [rule['type']]
+        where.append(f"type IN ({', '.join('?' * len(types))})")
+        params.extend(types)
+    if 'archived' in rule:
+        where.append('is_archived = ?')
+        params.append(int(rule['archived']))
+    if 'marked' in rule:
+        where.append('is_marked = ?')
+        params.append(int(rule['marked']))
+    if 'label' in rule:
+        where.append('id IN (SELECT bookmark_id FROM labels WHERE label = ?)')
+        params.append(rule['label'])
+    if 'site' in rule:
+        where.append('site = ?')
+        params.append(rule['site'])
+    if 'older_than_days' in rule:
+        cutoff = now - datetime.timedelta(days=rule['older_than_days'])
+        where.append('created < ?')
+        params.append(cutoff.strftime('%Y-%m-%d'))
+    sql = f"SELECT id, created FROM bookmarks WHERE {' AND '.join(where) or '1'}"
+    if 'keep_newest' in rule:
+        sql = (
+            f"SELECT id FROM (SELECT id, ROW_NUMBER() OVER (ORDER BY created DESC) AS n FROM ({sql})) "
+            f"WHERE n > ?"
+        )
+        params.append(rule['keep_newest'])
+    else:
+        sql = f"SELECT id FROM ({sql})"
+    return sql, params
+
+
+def select_deletions(conn, policy, now=None):
+    """Evaluate every rule in one query and return [(bookmark row, [rule names])]."""
+    now = now or datetime.datetime.now()
+    parts, params = [], []
+    for index, rule in enumerate(policy.get('rules', [])):
+        sql, rule_params = rule_sql(rule, now)
+        parts.append(f"SELECT id, ? AS rule FROM ({sql})")
+        params.extend([rule.get('name', f"rule {index + 1}"), *rule_params])
+    if not parts:
+        return []
+
+    keep = policy.get('keep', {})
+    spared = []
+    if keep.get('marked'):
+        spared.append('b.is_marked = 1')
+    if keep.get('annotated'):
+        spared.append('b.id IN (SELECT bookmark_id FROM annotations)')
+    if keep.get('labels'):
+        spared.append(
+            f"b.id IN (SELECT bookmark_id FROM labels WHERE label IN ({', '.join('?' * len(keep['labels']))}))"
+        )
+        params.extend(keep['labels'])
+
+    rows = conn.execute(
+        # char(31) (unit separator) can't clash with a rule name the way ', ' can.
+        f"""SELECT b.raw, GROUP_CONCAT(m.rule, char(31)) AS rules
+            FROM ({' UNION ALL '.join(parts)}) m JOIN bookmarks b ON b.id = m.id
+            WHERE NOT ({' OR '.join(spared) or '0'})
+            GROUP BY b.id ORDER BY b.created""",
+        params,
+    ).fetchall()
+    return [(json.loads(row['raw']), row['rules'].split('\x1f')) for row in rows]
+
+
+def main():
+    workers = int(os.environ.get('DELETE_WORKERS', '8'))
+    rate = float(os.environ.get('DELETE_RATE', '10'))
+    dry_run = os.environ.get('DRY_RUN', 'false').lower() == 'true'
+    rules_path = sys.argv[1] if len(sys.argv) > 1 else os.environ.get('READECK_RULES')
+    if not rules_path:
+        print("Usage: retention.py RULES.json (or set READECK_RULES)")
+        sys.exit(1)
+    with open(rules_path) as f:
+        policy = json.load(f)
+
+    client = client_from_env(rate=rate)
+    conn = open_db()
+    updated, deleted = sync(client, conn)
+    print(f"Mirror synced: {updated} updated, {deleted} deleted.")
+
+    selected = select_deletions(conn, policy)
+    conn.close()
+    if not selected:
+        print("No bookmarks match the retention rules.")
+        return
+
+    per_rule = {}
+    for _, rules in selected:
+        for name in rules:
+            per_rule[name] = per_rule.get(name, 0) + 1
+    for name, count in sorted(per_rule.items()):
+        print(f"  {name}: {count} bookmarks")
+
+    if dry_run:
+        print("DRY_RUN is enabled. No bookmarks will be deleted.")
+    else:
+        print(f"Deleting {len(selected)} bookmarks with {workers} workers at up to {rate:g} requests/s...")
+    archive = archive_from_env()
+    archive_only = os.environ.get('ARCHIVE_ONLY', 'false').lower() == 'true'
+    found, counts, _, elapsed = delete_bookmarks(
+        client, (b for b, _ in selected), workers, dry_run, archive, archive_only
+    )
+    if archive is not None:
+        archive.close()
+    print_summary(found, counts, elapsed, dry_run)
+    if counts['failed']:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
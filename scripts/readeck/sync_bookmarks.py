@@ -0,0 +1,179 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+from readeck_api import client_from_env, fetch_by_ids, get_json
+
+DEFAULT_DB = os.path.expanduser('~/.local/share/readeck/bookmarks.sqlite3')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bookmarks (
+    id TEXT PRIMARY KEY,
+    url TEXT,
+    title TEXT,
+    site TEXT,
+    type TEXT,
+    created TEXT,
+    updated TEXT,
+    published TEXT,
+    is_marked INTEGER,
+    is_archived INTEGER,
+    read_progress INTEGER,
+    has_article INTEGER,
+    word_count INTEGER,
+    raw TEXT
+);
+CREATE TABLE IF NOT EXISTS labels (
+    bookmark_id TEXT REFERENCES bookmarks(id) ON DELETE CASCADE,
+    label TEXT,
+    PRIMARY KEY (bookmark_id, label)
+);
+CREATE INDEX IF NOT EXISTS labels_label ON labels(label);
+CREATE INDEX IF NOT EXISTS bookmarks_created ON bookmarks(created);
+CREATE TABLE IF NOT EXISTS annotations (
+    id TEXT PRIMARY KEY,
+    bookmark_id TEXT,
+    created TEXT
+);
+CREATE INDEX IF NOT EXISTS annotations_bookmark ON annotations(bookmark_id);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def open_db(path=None):
+    """Open (and create if needed) the local bookmark mirror."""
+    path = path or os.environ.get('READECK_DB', DEFAULT_DB)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA foreign_keys=ON')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def get_state(conn, key):
+    row = conn.execute('SELECT value FROM sync_state WHERE key = ?', (key,)).fetchone()
+    return row['value'] if row else None
+
+
+def set_state(conn, key, value):
+    conn.execute('INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)', (key, value))
+
+
+def upsert_bookmark(conn, bookmark):
+    conn.execute(
+        """INSERT OR REPLACE INTO bookmarks
+           (id, url, title, site, type, created, updated, published, is_marked,
+            is_archived, read_progress, has_article, word_count, raw)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        (
+            bookmark['id'],
+            bookmark.get('url'),
+            bookmark.get('title'),
+            bookmark.get('site'),
+            bookmark.get('type'),
+            bookmark.get('created'),
+            bookmark.get('updated'),
+            bookmark.get('published'),
+            int(bool(bookmark.get('is_marked'))),
+            int(bool(bookmark.get('is_archived'))),
+            bookmark.get('read_progress') or 0,
+            int(bool(bookmark.get('has_article'))),
+            bookmark.get('word_count') or 0,
+            json.dumps(bookmark),
+        ),
+    )
+    conn.execute('DELETE FROM labels WHERE bookmark_id = ?', (bookmark['id'],))
+    conn.executemany(
+        'INSERT OR IGNORE INTO labels (bookmark_id, label) VALUES (?, ?)',
+        [(bookmark['id'], label) for label in bookmark.get('labels') or []],
+    )
+
+
+def sync_annotations(client, conn, page_size=100):
+    """Replace the mirrored highlight list; returns how many there are.
+
+    /bookmarks/annotations has no change feed, but highlights are few
+    compared to bookmarks, so a full listing each sync is cheap.
+    """
+    annotations = []
+    offset = 0
+    while True:
+        page = get_json(client, '/bookmarks/annotations', {'limit': page_size, 'offset': offset})
+        annotations.extend(page)
+        if len(page) < page_size:
+            break
+        offset += page_size
+    with conn:
+        conn.execute('DELETE FROM annotations')
+        conn.executemany(
+            'INSERT OR REPLACE INTO annotations (id, bookmark_id, created) VALUES (?, ?, ?)',
+            [(a['id'], a.get('bookmark_id'), a.get('created')) for a in annotations],
+        )
+    return len(annotations)
+
+
+def sync(client, conn, workers=4, full=False):
+    """Bring the mirror up to date and return (updated, deleted) counts.
+
+    The first run (or full=True) lists every bookmark id from /bookmarks/sync
+    and drops local rows that no longer exist. Later runs pass the newest
+    change time seen so far as `since`, so only changed and deleted ids come
+    back. Changed bookmarks are then fetched 100 ids per call on `workers`
+    threads, while this thread writes them to SQLite.
+    """
+    since = None if full else get_state(conn, 'since')
+    entries = get_json(client, '/bookmarks/sync', {'since': since} if since else None)
+    updated = [e['id'] for e in entries if e.get('type') != 'delete']
+    deleted = [e['id'] for e in entries if e.get('type') == 'delete']
+
+    if since is None:
+        # Without `since` the server only reports live bookmarks, so anything
+        # else in the mirror has been deleted.
+        live = set(updated)
+        deleted = [row['id'] for row in conn.execute('SELECT id FROM bookmarks') if row['id'] not in live]
+
+    batches = [updated[i:i + 100] for i in range(0, len(updated), 100)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for done, bookmarks in enumerate(pool.map(lambda ids: list(fetch_by_ids(client, ids)), batches), 1):
+            with conn:
+                for bookmark in bookmarks:
+                    upsert_bookmark(conn, bookmark)
+            if done % 10 == 0:
+                print(f"Synced {min(done * 100, len(updated))} / {len(updated)} bookmarks...")
+
+    with conn:
+        conn.executemany('DELETE FROM bookmarks WHERE id = ?', [(i,) for i in deleted])
+        times = [e['time'] for e in entries if e.get('time')]
+        if times:
+            # `since` is inclusive, so re-reading the newest change next time is harmless.
+            set_state(conn, 'since', max(times))
+    sync_annotations(client, conn)
+    return len(updated), len(deleted)
+
+
+def main():
+    workers = int(os.environ.get('SYNC_WORKERS', '4'))
+    rate = float(os.environ.get('SYNC_RATE', '10'))
+    full = '--full' in sys.argv[1:]
+
+    client = client_from_env(rate=rate)
+    conn = open_db()
+
+    started = time.monotonic()
+    updated, deleted = sync(client, conn, workers=workers, full=full)
+    total = conn.execute('SELECT COUNT(*) FROM bookmarks').fetchone()[0]
+    print(
+        f"Synced {updated} updated and {deleted} deleted bookmarks in "
+        f"{time.monotonic() - started:.1f}s; mirror holds {total}."
+    )
+
+if __name__ == "__main__":
+    main()